@@ -0,0 +1,50 @@
+"""add counter columns
+
+Revision ID: 3b9e1f0c6a21
+Revises: 45057f5761e7
+Create Date: 2026-10-18 09:12:40.512311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e1f0c6a21'
+down_revision: Union[str, None] = '45057f5761e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('courses', sa.Column('member_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('courses', sa.Column('quiz_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('course_quizzes', sa.Column('question_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('course_quizzes', sa.Column('total_attempts', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill từ dữ liệu hiện có
+    op.execute(
+        "UPDATE courses SET "
+        "member_count = (SELECT count(*) FROM course_enrollments "
+        "WHERE course_enrollments.course_id = courses.id), "
+        "quiz_count = (SELECT count(*) FROM course_quizzes "
+        "WHERE course_quizzes.course_id = courses.id)"
+    )
+    op.execute(
+        "UPDATE course_quizzes SET "
+        "question_count = (SELECT count(*) FROM quiz_questions "
+        "WHERE quiz_questions.quiz_id = course_quizzes.id), "
+        "total_attempts = (SELECT count(*) FROM quiz_attempts "
+        "WHERE quiz_attempts.quiz_id = course_quizzes.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('course_quizzes', 'total_attempts')
+    op.drop_column('course_quizzes', 'question_count')
+    op.drop_column('courses', 'quiz_count')
+    op.drop_column('courses', 'member_count')
@@ -0,0 +1,76 @@
+"""add user quiz status
+
+Revision ID: 5f0e9a2c7d18
+Revises: d41a7b93e5c2
+Create Date: 2026-10-18 19:31:02.447519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0e9a2c7d18'
+down_revision: Union[str, None] = 'd41a7b93e5c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNIQUE_NAME = 'uq_quiz_attempts_user_id_quiz_id_attempt_number'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_quiz_status',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('quiz_id', sa.UUID(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['quiz_id'], ['course_quizzes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['app_users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'quiz_id')
+    )
+
+    # Đánh số lại các attempt bị trùng số (do start đồng thời trước đây)
+    op.execute(
+        "UPDATE quiz_attempts SET attempt_number = r.rn "
+        "FROM (SELECT id, row_number() OVER ("
+        "  PARTITION BY user_id, quiz_id "
+        "  ORDER BY attempt_number, started_at, id) AS rn "
+        "  FROM quiz_attempts) r "
+        "WHERE quiz_attempts.id = r.id AND quiz_attempts.attempt_number <> r.rn"
+    )
+    op.execute(
+        "INSERT INTO user_quiz_status (user_id, quiz_id, attempt_count) "
+        "SELECT user_id, quiz_id, max(attempt_number) FROM quiz_attempts "
+        "GROUP BY user_id, quiz_id"
+    )
+
+    # Unique index build không khoá ghi, sau đó gắn thành constraint.
+    # Index unique bắt đầu bằng (user_id, quiz_id) nên thay index cũ.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            UNIQUE_NAME, 'quiz_attempts',
+            ['user_id', 'quiz_id', 'attempt_number'], unique=True,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.execute(
+            f"ALTER TABLE quiz_attempts ADD CONSTRAINT {UNIQUE_NAME} "
+            f"UNIQUE USING INDEX {UNIQUE_NAME}"
+        )
+        op.drop_index(
+            'ix_quiz_attempts_user_id_quiz_id', table_name='quiz_attempts',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_quiz_attempts_user_id_quiz_id', 'quiz_attempts',
+            ['user_id', 'quiz_id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+    op.drop_constraint(UNIQUE_NAME, 'quiz_attempts', type_='unique')
+    op.drop_table('user_quiz_status')
@@ -0,0 +1,60 @@
+"""add quiz score stats
+
+Revision ID: 8c2d4e6f1a37
+Revises: 3b9e1f0c6a21
+Create Date: 2026-10-18 14:05:11.803145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2d4e6f1a37'
+down_revision: Union[str, None] = '3b9e1f0c6a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('quiz_score_stats',
+    sa.Column('quiz_id', sa.UUID(), nullable=False),
+    sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('mean', sa.Float(), server_default='0', nullable=False),
+    sa.Column('m2', sa.Float(), server_default='0', nullable=False),
+    sa.Column('min_score', sa.Float(), nullable=True),
+    sa.Column('max_score', sa.Float(), nullable=True),
+    sa.Column('histogram', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['quiz_id'], ['course_quizzes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('quiz_id')
+    )
+
+    # Backfill từ các attempt đã nộp; histogram 10 khoảng trên thang 10
+    # (khớp services.statistics.HISTOGRAM_BINS)
+    op.execute(
+        "INSERT INTO quiz_score_stats "
+        "(quiz_id, count, mean, m2, min_score, max_score, histogram, updated_at) "
+        "SELECT q.id, count(a.score), coalesce(avg(a.score), 0), "
+        "coalesce(var_pop(a.score) * count(a.score), 0), "
+        "min(a.score), max(a.score), "
+        "(SELECT json_agg(h.n ORDER BY h.b) FROM ("
+        "  SELECT b, count(a2.id) AS n FROM generate_series(0, 9) AS b "
+        "  LEFT JOIN quiz_attempts a2 ON a2.quiz_id = q.id "
+        "  AND a2.finished_at IS NOT NULL AND a2.score IS NOT NULL "
+        "  AND least(greatest(floor(a2.score)::int, 0), 9) = b "
+        "  GROUP BY b) h), "
+        "now() "
+        "FROM course_quizzes q "
+        "LEFT JOIN quiz_attempts a ON a.quiz_id = q.id "
+        "AND a.finished_at IS NOT NULL AND a.score IS NOT NULL "
+        "GROUP BY q.id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('quiz_score_stats')
@@ -0,0 +1,50 @@
+"""add user quiz status results
+
+Revision ID: a7c3e1d95b40
+Revises: 5f0e9a2c7d18
+Create Date: 2026-10-18 21:04:36.118052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e1d95b40'
+down_revision: Union[str, None] = '5f0e9a2c7d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_quiz_status', sa.Column('best_score', sa.Float(), nullable=True))
+    op.add_column('user_quiz_status', sa.Column('last_score', sa.Float(), nullable=True))
+    op.add_column('user_quiz_status', sa.Column('last_finished_at', sa.TIMESTAMP(), nullable=True))
+
+    # Backfill: điểm cao nhất của các lần đã nộp, và kết quả lần làm mới nhất
+    op.execute(
+        "UPDATE user_quiz_status SET best_score = b.best "
+        "FROM (SELECT user_id, quiz_id, max(score) AS best FROM quiz_attempts "
+        "  WHERE finished_at IS NOT NULL GROUP BY user_id, quiz_id) b "
+        "WHERE user_quiz_status.user_id = b.user_id "
+        "AND user_quiz_status.quiz_id = b.quiz_id"
+    )
+    op.execute(
+        "UPDATE user_quiz_status SET last_score = a.score, "
+        "last_finished_at = a.finished_at "
+        "FROM quiz_attempts a "
+        "WHERE a.user_id = user_quiz_status.user_id "
+        "AND a.quiz_id = user_quiz_status.quiz_id "
+        "AND a.attempt_number = user_quiz_status.attempt_count "
+        "AND a.finished_at IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user_quiz_status', 'last_finished_at')
+    op.drop_column('user_quiz_status', 'last_score')
+    op.drop_column('user_quiz_status', 'best_score')
@@ -0,0 +1,31 @@
+"""add version to courses and quizzes
+
+Revision ID: b6d8f2a4c913
+Revises: e2b86f4c0d59
+Create Date: 2026-10-18 23:12:07.402518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d8f2a4c913'
+down_revision: Union[str, None] = 'e2b86f4c0d59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # server_default hằng số: PostgreSQL không phải ghi lại bảng
+    op.add_column('courses', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('course_quizzes', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('course_quizzes', 'version')
+    op.drop_column('courses', 'version')
@@ -0,0 +1,60 @@
+"""add keyset pagination indexes
+
+Revision ID: c3f7a9e1b254
+Revises: b6d8f2a4c913
+Create Date: 2026-10-19 09:41:18.530662
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f7a9e1b254'
+down_revision: Union[str, None] = 'b6d8f2a4c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tên index, bảng, cột) — khớp khoá sắp xếp truyền cho paginate()
+INDEXES = [
+    ('ix_courses_created_at_id', 'courses', ['created_at', 'id']),
+    ('ix_course_quizzes_course_id_created_at_id', 'course_quizzes', ['course_id', 'created_at', 'id']),
+    ('ix_app_users_created_at_id', 'app_users', ['created_at', 'id']),
+    ('ix_quiz_attempts_user_id_started_at_id', 'quiz_attempts', ['user_id', 'started_at', 'id']),
+    ('ix_quiz_attempts_quiz_id_started_at_id', 'quiz_attempts', ['quiz_id', 'started_at', 'id']),
+]
+
+# Index ghép (course_id, created_at, id) thay cho index một cột này
+REPLACED = ('ix_course_quizzes_course_id', 'course_quizzes', ['course_id'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tạo CONCURRENTLY như d41a7b93e5c2: không khoá ghi bảng
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+        name, table, _ = REPLACED
+        op.drop_index(
+            name, table_name=table,
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        name, table, columns = REPLACED
+        op.create_index(
+            name, table, columns,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
@@ -0,0 +1,53 @@
+"""add hot path indexes
+
+Revision ID: d41a7b93e5c2
+Revises: 8c2d4e6f1a37
+Create Date: 2026-10-18 16:22:47.190384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7b93e5c2'
+down_revision: Union[str, None] = '8c2d4e6f1a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tên index, bảng, cột) — khớp index=True / Index(...) trong app.models.models
+INDEXES = [
+    ('ix_quiz_attempts_user_id_quiz_id', 'quiz_attempts', ['user_id', 'quiz_id']),
+    ('ix_quiz_attempts_quiz_id_user_id', 'quiz_attempts', ['quiz_id', 'user_id']),
+    ('ix_quiz_attempt_answers_attempt_id', 'quiz_attempt_answers', ['attempt_id']),
+    ('ix_quiz_questions_quiz_id', 'quiz_questions', ['quiz_id']),
+    ('ix_question_options_question_id', 'question_options', ['question_id']),
+    ('ix_course_enrollments_course_id_user_id', 'course_enrollments', ['course_id', 'user_id']),
+    ('ix_course_enrollments_user_id', 'course_enrollments', ['user_id']),
+    ('ix_course_quizzes_course_id', 'course_quizzes', ['course_id']),
+    ('ix_app_users_full_name', 'app_users', ['full_name']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY không khoá ghi bảng nhưng không chạy được
+    # trong transaction → autocommit_block. Nếu bị ngắt giữa chừng, PG để lại
+    # index INVALID: DROP INDEX CONCURRENTLY rồi chạy lại migration.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
@@ -0,0 +1,37 @@
+"""quiz attempt score float
+
+Revision ID: e2b86f4c0d59
+Revises: a7c3e1d95b40
+Create Date: 2026-10-18 22:40:19.562707
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b86f4c0d59'
+down_revision: Union[str, None] = 'a7c3e1d95b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Điểm thang 10 có phần thập phân (compute_score); cột INTEGER làm tròn
+    # khi ghi nên response của submit khác với dữ liệu đã lưu
+    op.alter_column('quiz_attempts', 'score',
+               existing_type=sa.Integer(),
+               type_=sa.Float(),
+               existing_nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('quiz_attempts', 'score',
+               existing_type=sa.Float(),
+               type_=sa.Integer(),
+               existing_nullable=True,
+               postgresql_using='round(score)::integer')
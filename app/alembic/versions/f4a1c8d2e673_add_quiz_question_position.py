@@ -0,0 +1,60 @@
+"""add quiz question position
+
+Revision ID: f4a1c8d2e673
+Revises: c3f7a9e1b254
+Create Date: 2026-10-19 10:26:53.871204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a1c8d2e673'
+down_revision: Union[str, None] = 'c3f7a9e1b254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('quiz_questions', sa.Column('position', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill: câu hỏi không bao giờ bị UPDATE nên thứ tự vật lý (ctid)
+    # gần đúng với thứ tự insert, tức thứ tự giáo viên nhập
+    op.execute(
+        "UPDATE quiz_questions SET position = p.position "
+        "FROM (SELECT id, row_number() OVER ("
+        "  PARTITION BY quiz_id ORDER BY ctid) AS position "
+        "  FROM quiz_questions) p "
+        "WHERE quiz_questions.id = p.id"
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_quiz_questions_quiz_id_position_id', 'quiz_questions',
+            ['quiz_id', 'position', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Index ghép ở trên thay cho index một cột quiz_id
+        op.drop_index(
+            'ix_quiz_questions_quiz_id', table_name='quiz_questions',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_quiz_questions_quiz_id', 'quiz_questions', ['quiz_id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_quiz_questions_quiz_id_position_id',
+            table_name='quiz_questions',
+            postgresql_concurrently=True, if_exists=True,
+        )
+    op.drop_column('quiz_questions', 'position')
@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from app.core.config import (
+    ANSWER_KEY_CACHE_SIZE,
+    ANSWER_KEY_CACHE_TTL,
+    PAGINATION_COUNT_CACHE_SIZE,
+    PAGINATION_COUNT_CACHE_TTL,
+    PRINCIPAL_CACHE_SIZE,
+    PRINCIPAL_CACHE_TTL,
+    QUIZ_SNAPSHOT_CACHE_SIZE,
+    QUIZ_SNAPSHOT_CACHE_TTL,
+)
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with LRU eviction and per-entry TTL.
+
+    Entries are dropped when they are older than `ttl` seconds, and the
+    least recently used entry is evicted once `maxsize` is reached.
+    The cache is local to one worker process: other workers only see an
+    invalidation once their own entry expires.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> None:
+        """Drops every entry whose value matches `predicate`."""
+        with self._lock:
+            for key in [k for k, (_, v) in self._data.items() if predicate(v)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Đáp án của các quiz đã publish, key = quiz_id
+answer_key_cache = TTLCache(ANSWER_KEY_CACHE_SIZE, ANSWER_KEY_CACHE_TTL)
+
+# Tổng số bản ghi của các query phân trang (total_mode="cached")
+count_cache = TTLCache(PAGINATION_COUNT_CACHE_SIZE, PAGINATION_COUNT_CACHE_TTL)
+
+# Người dùng đã xác thực (AppUser detached), key = "sub" của token
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+# Snapshot quiz đã publish (mtime_ns file, bytes), key = quiz_id
+quiz_snapshot_cache = TTLCache(QUIZ_SNAPSHOT_CACHE_SIZE, QUIZ_SNAPSHOT_CACHE_TTL)
@@ -0,0 +1,42 @@
+import hashlib
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds a weak ETag from the values a representation depends on
+    (row id, version counter, denormalized counters, query string...).
+
+    The tag is weak because ResponseWrapperMiddleware re-encodes the body
+    into the envelope: the representation is equivalent, not byte-stable.
+    """
+    raw = ":".join(str(part) for part in parts).encode()
+    return 'W/"%s"' % hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    True when the request's If-None-Match names `etag` (weak comparison,
+    RFC 9110 §13.1.2) or is `*`.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = _opaque(etag)
+    return any(_opaque(tag) == current for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Empty 304 response. It has no content-type, so the envelope middleware
+    passes it through untouched.
+    """
+    return Response(status_code=304, headers={"ETag": etag})
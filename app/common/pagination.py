@@ -1,6 +1,16 @@
-from typing import Generic, TypeVar
+import base64
+import json
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Callable, Generic, TypeVar
 
+from fastapi import HTTPException
 from pydantic import BaseModel, Field
+from sqlalchemy import asc, desc, func, literal, tuple_
+from sqlalchemy.orm import Query
+
+from app.common.cache import count_cache
 
 
 class PaginationRequest(BaseModel):
@@ -9,6 +19,11 @@ class PaginationRequest(BaseModel):
     """
     page: int = Field(1, ge=1, description="The current page number (default: 1).")
     page_size: int = Field(10, ge=1, le=100, description="The number of records per page (default: 10).")
+    cursor: str | None = Field(
+        None,
+        description="Opaque cursor from a previous `next_cursor`. "
+        "When set, keyset pagination is used and `page` is ignored.",
+    )
 
 
 T = TypeVar("T")
@@ -28,4 +43,218 @@ class PaginationResponse(BaseModel, Generic[T]):
     next: int | None = Field(
         None, description="The next page number if available.", example=2
     )
+    next_cursor: str | None = Field(
+        None, description="Opaque cursor of the next page if available."
+    )
     data: list[T] = Field(..., description="List of items on the current page.")
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """
+    Encodes the sort-key values of the last row into an opaque cursor.
+    """
+    payload = [
+        v.isoformat() if isinstance(v, datetime)
+        else str(v) if isinstance(v, uuid.UUID)
+        else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list[Any]:
+    """
+    Decodes a cursor produced by `encode_cursor` for the given sort columns.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError("cursor length mismatch")
+        return [_coerce(v, c) for v, c in zip(payload, columns)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _coerce(value: Any, column) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return value
+
+
+def count_total(query: Query, total_mode: str = "exact") -> int:
+    """
+    Counts the rows of a query.
+
+    Args:
+        query (Query): The query to count.
+        total_mode (str): "exact" runs COUNT(*), "cached" reuses a recent
+            exact count of the same statement, "estimated" reads the
+            PostgreSQL planner's row estimate (no table scan).
+    """
+    if total_mode == "estimated":
+        estimate = estimate_count(query)
+        if estimate is not None:
+            return estimate
+    if total_mode == "cached":
+        key = _count_cache_key(query)
+        total = count_cache.get(key)
+        if total is None:
+            total = query.order_by(None).count()
+            count_cache.set(key, total)
+        return total
+    return query.order_by(None).count()
+
+
+def estimate_count(query: Query) -> int | None:
+    """
+    Returns the planner's row estimate for a query on PostgreSQL,
+    or None on other databases.
+    """
+    connection = query.session.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+    compiled = query.order_by(None).statement.compile(
+        dialect=connection.dialect
+    )
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    plan = connection.exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + compiled.string, params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _count_cache_key(query: Query) -> str:
+    compiled = query.order_by(None).statement.compile()
+    return f"{compiled.string}|{sorted(compiled.params.items())!r}"
+
+
+def _strip_total(query: Query, rows: list) -> list:
+    """
+    Drops the trailing `count(*) OVER ()` column from each row.
+
+    A single ORM entity is unwrapped to the object; any other row keeps its
+    column names, so `row.user_id` and tuple unpacking both still work.
+    """
+    descriptions = query.column_descriptions
+    if len(descriptions) == 1 and descriptions[0]["expr"] is descriptions[0]["entity"]:
+        return [r[0] for r in rows]
+    if not rows:
+        return []
+    Row = namedtuple("Row", rows[0]._fields[:-1], rename=True)
+    return [Row(*r[:-1]) for r in rows]
+
+
+def paginate(
+    query: Query,
+    order_by: list,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: str | None = None,
+    descending: bool = False,
+    row_entity: Callable[[Any], Any] | None = None,
+    total_mode: str = "exact",
+) -> dict:
+    """
+    Paginates a query by page number or, when `cursor` is given, by keyset.
+
+    `order_by` must end with a unique column (usually the primary key) so
+    that the ordering is total and stable. Keyset mode filters with a row
+    comparison on those columns instead of OFFSET, so every page costs the
+    same as the first one; it does not compute totals.
+
+    In page mode with `total_mode="exact"` the total comes from a
+    `COUNT(*) OVER ()` column of the page query itself, so the page and
+    its total cost a single round trip. The other modes (see
+    `count_total`) are meant for very large tables.
+
+    Args:
+        query (Query): The base query, without ORDER BY.
+        order_by (list): The sort-key columns, e.g. [created_at, id].
+        page (int): The page number (page mode).
+        page_size (int): The number of items per page.
+        cursor (str | None): The opaque cursor of the requested page.
+        descending (bool): Sort all keys descending.
+        row_entity (Callable | None): Maps a result row to the ORM object
+            holding the sort keys, for queries returning tuples.
+        total_mode (str): "exact", "cached" or "estimated".
+
+    Returns:
+        dict: The fields of `PaginationResponse`, `data` holds raw rows.
+    """
+    direction = desc if descending else asc
+    ordered = query.order_by(None).order_by(*[direction(c) for c in order_by])
+    entity = row_entity or (lambda row: row)
+
+    def cursor_of(row) -> str:
+        obj = entity(row)
+        return encode_cursor([getattr(obj, c.key) for c in order_by])
+
+    if cursor is None:
+        offset = (page - 1) * page_size
+        if total_mode == "exact":
+            rows = (
+                ordered.add_columns(func.count().over().label("_total"))
+                .offset(offset)
+                .limit(page_size)
+                .all()
+            )
+            items = _strip_total(query, rows)
+            if rows:
+                total_items = rows[0][-1]
+            elif page == 1:
+                total_items = 0
+            else:
+                # Trang vượt quá cuối: không có dòng nào để đọc tổng
+                total_items = count_total(query)
+        else:
+            total_items = count_total(query, total_mode)
+            items = ordered.offset(offset).limit(page_size).all()
+
+        total_page = (total_items + page_size - 1) // page_size
+        has_next = page < total_page
+        return {
+            "page": page,
+            "page_size": page_size,
+            "total_page": total_page,
+            "total_items": total_items,
+            "next": page + 1 if has_next else None,
+            "next_cursor": cursor_of(items[-1]) if has_next and items else None,
+            "data": items,
+        }
+
+    values = decode_cursor(cursor, order_by)
+    keys = tuple_(*order_by)
+    bound = tuple_(*[literal(v, c.type) for v, c in zip(values, order_by)])
+    items = (
+        ordered.filter(keys < bound if descending else keys > bound)
+        .limit(page_size + 1)
+        .all()
+    )
+    has_next = len(items) > page_size
+    items = items[:page_size]
+    return {
+        "page": None,
+        "page_size": page_size,
+        "total_page": None,
+        "total_items": None,
+        "next": None,
+        "next_cursor": cursor_of(items[-1]) if has_next else None,
+        "data": items,
+    }
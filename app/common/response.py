@@ -1,10 +1,20 @@
 
+import json
+from datetime import date, datetime, time
 from typing import Generic
+from uuid import UUID
 
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing_extensions import Any, TypedDict, TypeVar
 
+from app.core.config import JSON_ENCODER
+
+try:
+    import orjson
+except ImportError:  # orjson là tuỳ chọn → dùng json của stdlib
+    orjson = None
+
 
 T = TypeVar("T")
 
@@ -63,7 +73,63 @@ class AppResponseModel(BaseModel, Generic[T]):
         return result
 
 
-class BusinessJsonResponse(JSONResponse):
+USE_ORJSON = JSON_ENCODER == "orjson" and orjson is not None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON "
+                    "serializable")
+
+
+def json_dumps(content: Any) -> bytes:
+    """
+    Encodes `content` to compact UTF-8 JSON.
+
+    Uses orjson when it is installed and enabled (`JSON_ENCODER`), and the
+    stdlib otherwise. Both write compact UTF-8 JSON like Starlette's
+    `JSONResponse` and handle UUID and datetime values directly.
+
+    The two encoders differ on some floats:
+
+    - Exponent notation: orjson writes `1e20` and `0.00001` where the
+      stdlib writes `1e+20` and `1e-05`. The parsed values are the same.
+    - NaN and Infinity: orjson writes `null`, while the stdlib raises
+      `ValueError` (`allow_nan=False`).
+
+    The floats the API returns (scores and the statistics mean, variance
+    and standard deviation on the 0-10 scale) are written identically by
+    both encoders.
+    """
+    if USE_ORJSON:
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Kiểu orjson không hỗ trợ (vd: int > 64 bit) → dùng stdlib
+            pass
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    A JSONResponse rendered with `json_dumps`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+class BusinessJsonResponse(FastJSONResponse):
     """
     A JSONResponse that includes a business code in the response headers.
     """
@@ -1,4 +1,5 @@
 import os
+import re
 from dotenv import load_dotenv
 
 # Lấy thư mục app/ từ file config.py (nếu config.py nằm trong app/core/)
@@ -11,4 +12,56 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback_secret")
 
 if DATABASE_URL is None:
-    raise ValueError("DATABASE_URL chưa được set trong .env")
\ No newline at end of file
+    raise ValueError("DATABASE_URL chưa được set trong .env")
+
+# Connection pool (dùng cho cả engine sync và async)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Log mọi câu SQL ra stdout, chỉ nên bật khi debug
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+# Chế độ async: dùng AsyncSession (asyncpg) cho các endpoint của học sinh
+DB_ASYNC_MODE = os.getenv("DB_ASYNC_MODE", "false").lower() == "true"
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or re.sub(
+    r"^postgresql(\+\w+)?://", "postgresql+asyncpg://", DATABASE_URL
+)
+
+# Cache đáp án quiz (in-process, LRU + TTL)
+ANSWER_KEY_CACHE_SIZE = int(os.getenv("ANSWER_KEY_CACHE_SIZE", "1024"))
+ANSWER_KEY_CACHE_TTL = int(os.getenv("ANSWER_KEY_CACHE_TTL", "300"))
+
+# Tổng số bản ghi khi phân trang: exact | cached | estimated
+# (áp dụng cho các bảng lớn như quiz_attempts)
+LARGE_TABLE_TOTAL_MODE = os.getenv("LARGE_TABLE_TOTAL_MODE", "exact")
+PAGINATION_COUNT_CACHE_SIZE = int(
+    os.getenv("PAGINATION_COUNT_CACHE_SIZE", "1024"))
+PAGINATION_COUNT_CACHE_TTL = int(os.getenv("PAGINATION_COUNT_CACHE_TTL", "60"))
+
+# Cache người dùng đã xác thực (get_current_user), key = token subject
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "4096"))
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+# Bộ mã hoá JSON cho response: orjson (nếu đã cài) | stdlib
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson").lower()
+
+# Parse PDF trong process riêng (không chặn event loop), tối đa
+# PDF_PARSE_WORKERS job cùng lúc
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", "2"))
+PDF_PARSE_TIMEOUT = int(os.getenv("PDF_PARSE_TIMEOUT", "120"))
+PDF_MAX_UPLOAD_BYTES = int(
+    os.getenv("PDF_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+# Cache kết quả parse PDF trên đĩa (key = sha256 nội dung + phiên bản parser)
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "uploads/pdf_cache")
+PDF_CACHE_MAX_BYTES = int(
+    os.getenv("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Cách ghi hàng loạt câu hỏi: insert (INSERT nhiều dòng) | copy (COPY, chỉ PG)
+QUESTION_BULK_MODE = os.getenv("QUESTION_BULK_MODE", "insert").lower()
+
+# Snapshot (JSON đã mã hoá sẵn) của quiz đã publish: bộ nhớ + đĩa
+QUIZ_SNAPSHOT_DIR = os.getenv("QUIZ_SNAPSHOT_DIR", "uploads/quiz_snapshots")
+QUIZ_SNAPSHOT_CACHE_SIZE = int(os.getenv("QUIZ_SNAPSHOT_CACHE_SIZE", "256"))
+QUIZ_SNAPSHOT_CACHE_TTL = int(os.getenv("QUIZ_SNAPSHOT_CACHE_TTL", "3600"))
@@ -0,0 +1,96 @@
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """
+    Counters collected on every connection checkout of an instrumented pool.
+
+    `checkout` latency is the full time spent in the pool, including
+    opening a new connection. `wait` only counts checkouts that found the
+    pool saturated (no idle connection, overflow exhausted) and had to
+    block until another request returned a connection.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_time = 0.0
+        self.max_checkout_time = 0.0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+
+    def record(self, elapsed: float, waited: bool, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.checkout_time += elapsed
+                self.max_checkout_time = max(self.max_checkout_time, elapsed)
+            if waited:
+                self.waits += 1
+                self.wait_time += elapsed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_checkout_ms": _ms(self.checkout_time, self.checkouts),
+                "max_checkout_ms": round(self.max_checkout_time * 1000, 3),
+                "waits": self.waits,
+                "total_wait_ms": round(self.wait_time * 1000, 3),
+                "avg_wait_ms": _ms(self.wait_time, self.waits),
+                "timeouts": self.timeouts,
+            }
+
+
+def _ms(total: float, count: int) -> float:
+    return round(total * 1000 / count, 3) if count else 0.0
+
+
+class _InstrumentedMixin:
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _saturated(self) -> bool:
+        return (
+            self.checkedin() == 0
+            and self._max_overflow > -1
+            and self.overflow() >= self._max_overflow
+        )
+
+    def _do_get(self):
+        waited = self._saturated()
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record(time.perf_counter() - start, waited, True)
+            raise
+        self.stats.record(time.perf_counter() - start, waited, False)
+        return conn
+
+    def usage(self) -> dict:
+        """Trạng thái hiện tại của pool kèm các counter đã thu thập."""
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            **self.stats.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedMixin, AsyncAdaptedQueuePool):
+    pass
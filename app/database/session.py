@@ -1,17 +1,67 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
-from app.core.config import DATABASE_URL
+from app.core.config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DB_ASYNC_MODE,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+)
+from app.database.pool import (
+    InstrumentedAsyncQueuePool, InstrumentedQueuePool)
+
+# Cấu hình pool dùng chung cho engine sync và async
+POOL_OPTIONS = {
+    "echo": DB_ECHO,
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
 
 # Tạo engine
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(
+    DATABASE_URL, poolclass=InstrumentedQueuePool, **POOL_OPTIONS
+)
 
 # Tạo session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine async (chỉ tạo khi bật DB_ASYNC_MODE, cần asyncpg + greenlet)
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import (
+        async_sessionmaker, create_async_engine)
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool,
+        **POOL_OPTIONS
+    )
+    # expire_on_commit=False: tránh lazy load ngoài greenlet sau commit
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
 # Base class cho models
 Base = declarative_base()
 
 
+def get_pool_stats() -> dict:
+    """
+    Số liệu connection pool của engine sync (và async nếu bật).
+    """
+    return {
+        "sync": engine.pool.usage(),
+        "async": async_engine.pool.usage() if async_engine else None,
+    }
+
+
 # Dependency để lấy session
 def get_db():
     db: Session = SessionLocal()
@@ -19,3 +69,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency để lấy AsyncSession
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("DB_ASYNC_MODE chưa được bật")
+    db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -0,0 +1,60 @@
+from uuid import UUID
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.common.cache import principal_cache
+from app.database.session import get_async_db
+from app.core.jwt import decode_token
+from app.dependencies.dependencies import security
+from app.repositories.aio import user as user_repo
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Phiên bản async của `get_current_user`, dùng AsyncSession
+    cho các router chạy ở chế độ DB_ASYNC_MODE.
+    """
+    token = credentials.credentials
+    try:
+        payload = decode_token(token)
+        user_id = payload.get("sub")
+
+        if not user_id:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token payload",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        # Người dùng đã xác thực gần đây → không cần query DB
+        user = principal_cache.get(user_id)
+        if user is not None:
+            return user
+
+        try:
+            user = await user_repo.get_user_by_id(db, UUID(user_id))
+        except ValueError:
+            # Nếu không phải UUID, tìm theo username hoặc email
+            user = await user_repo.get_user_by_name_or_email(db, user_id)
+
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        db.expunge(user)
+        principal_cache.set(user_id, user)
+        return user
+
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
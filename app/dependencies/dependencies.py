@@ -3,6 +3,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
+from app.common.cache import principal_cache
 from app.database.session import get_db
 from app.models.models import AppUser
 from app.core.jwt import decode_token
@@ -26,12 +27,15 @@ def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        # Người dùng đã xác thực gần đây → không cần query DB
+        user = principal_cache.get(user_id)
+        if user is not None:
+            return user
+
         # Thử parse UUID
         try:
             user_uuid = UUID(user_id)
-            print("Parsed UUID:", user_uuid)
             user = db.query(AppUser).filter(AppUser.id == user_uuid).first()
-            print("User found by UUID:", user.id if user else "None")
         except ValueError:
             # Nếu không phải UUID, tìm theo username hoặc email
             user = db.query(AppUser).filter(
@@ -44,11 +48,13 @@ def get_current_user(
                 detail="User not found",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        print("Authenticated user:", user.full_name)
+
+        # Tách khỏi session để dùng lại an toàn giữa các request
+        db.expunge(user)
+        principal_cache.set(user_id, user)
         return user
 
-    except Exception as e:
-        print("Token decode error:", str(e))
+    except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
@@ -1,6 +1,8 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import api_router
+from app.common.response import FastJSONResponse
 from app.middlewares.exception_handle import (
     BusinessException,
     IntegrityError,
@@ -11,8 +13,22 @@ from app.middlewares.exception_handle import (
     handler_validation_exception,
 )
 from app.middlewares.response_wrapper import ResponseWrapperMiddleware
+from app.utils.pdf_pool import shutdown_pdf_jobs
 
-app = FastAPI(title="QuizMaster API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    # Dừng các process parse PDF khi tắt app
+    shutdown_pdf_jobs()
+
+
+app = FastAPI(
+    title="QuizMaster API",
+    lifespan=lifespan,
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+)
 
 # CORS middleware
 
@@ -1,71 +1,102 @@
 
 import json
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import StreamingResponse, FileResponse, HTMLResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.common.response import AppResponseModel, BusinessJsonResponse
+from app.common.response import BusinessJsonResponse
 from app.constants.business_code import BusinessCode
 
+# Bỏ qua swagger / openapi / redoc
+SKIP_PATHS = ("/docs", "/openapi.json", "/redoc")
 
-class ResponseWrapperMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Bỏ qua swagger / openapi / redoc
-        if request.url.path.startswith(("/docs", "/openapi.json", "/redoc")):
-            return await call_next(request)
+_ALREADY_WRAPPED = b'{"business_code"'
 
-        response = await call_next(request)
 
-        # Bỏ qua các response đặc biệt
-        if isinstance(response, (FileResponse, StreamingResponse, HTMLResponse)):
-            return response
+def build_envelope(body: bytes, status_code: int) -> tuple[bytes, int]:
+    """
+    Wraps an already-encoded JSON body in the standard envelope.
 
-        # Chỉ wrap JSON
-        content_type = response.headers.get("content-type", "")
-        if "application/json" not in content_type.lower():
-            return response
+    The body is spliced in as raw bytes, so the payload is serialized only
+    once (by the route) and never decoded. The output is byte-identical to
+    `AppResponseModel(...).model_dump()` rendered by `BusinessJsonResponse`.
 
-        # Đọc lại body an toàn
+    Returns:
+        tuple[bytes, int]: The envelope bytes and its business code.
+    """
+    # Nếu đã có business_code → giữ nguyên
+    if body.startswith(_ALREADY_WRAPPED):
         try:
-            body_bytes = b""
-            if hasattr(response, "body") and response.body:
-                body_bytes = response.body
-            else:
-                body_bytes = b"".join([chunk async for chunk in response.body_iterator])
-
-            data = json.loads(body_bytes.decode()) if body_bytes else None
-        except Exception:
-            data = None
-
-        # Nếu đã có business_code → giữ nguyên
-        if isinstance(data, dict) and "business_code" in data:
-            return BusinessJsonResponse(
-                business_code=data.get("business_code", BusinessCode.SUCCESS["code"]),
-                content=data,
-                status_code=response.status_code,
-                headers={
-                    k: v
-                    for k, v in response.headers.items()
-                    if k.lower() != "content-length"
-                },
+            business_code = json.loads(body).get(
+                "business_code", BusinessCode.SUCCESS["code"]
             )
+        except ValueError:
+            business_code = BusinessCode.SUCCESS["code"]
+        return body, business_code
 
-        # Nếu chưa chuẩn → wrap lại với SUCCESS
-        wrapped = AppResponseModel(
-            business_code=BusinessCode.SUCCESS["code"],
-            status_code=response.status_code,
-            message=BusinessCode.SUCCESS["message"],
-            data=data,
-        ).model_dump()
-
-        # Luôn tạo response mới, xoá Content-Length cũ
-        return BusinessJsonResponse(
-            business_code=wrapped["business_code"],
-            content=wrapped,
-            status_code=response.status_code,
-            headers={
-                k: v
-                for k, v in response.headers.items()
-                if k.lower() != "content-length"
-            },
+    # Nếu chưa chuẩn → wrap lại với SUCCESS
+    business_code = BusinessCode.SUCCESS["code"]
+    prefix = (
+        '{"business_code":%d,"status_code":%d,"message":%s,"data":'
+        % (
+            business_code,
+            status_code,
+            json.dumps(BusinessCode.SUCCESS["message"], ensure_ascii=False),
         )
+    )
+    return prefix.encode() + (body or b"null") + b"}", business_code
+
+
+class ResponseWrapperMiddleware:
+    """
+    Pure ASGI middleware wrapping every JSON response in
+    `{business_code, status_code, message, data}`.
+
+    Non-JSON responses (files, streams, HTML, 304) pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(SKIP_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        body_parts: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+
+            if message["type"] == "http.response.start":
+                content_type = dict(message.get("headers", [])).get(
+                    b"content-type", b""
+                )
+                # Chỉ wrap JSON
+                if b"application/json" in content_type.lower():
+                    start_message = message
+                    return
+                await send(message)
+                return
+
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body, business_code = build_envelope(
+                b"".join(body_parts), start_message["status"]
+            )
+            start_message["headers"] = list(start_message.get("headers", []))
+            headers = MutableHeaders(scope=start_message)
+            headers["content-length"] = str(len(body))
+            headers[BusinessJsonResponse.header_business_code] = str(
+                business_code
+            )
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -5,8 +5,12 @@ from sqlalchemy import (
     String,
     Boolean,
     Integer,
+    Float,
+    JSON,
     ForeignKey,
+    Index,
     Text,
+    UniqueConstraint,
     TIMESTAMP,
     Enum as PgEnum,
 )
@@ -22,13 +26,19 @@ class AppUser(Base):
     __tablename__ = "app_users"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    full_name = Column(String(255), nullable=False)
+    # Đăng nhập tìm user theo full_name
+    full_name = Column(String(255), nullable=False, index=True)
     email = Column(String(255), nullable=False, unique=True)
     password = Column(String(255), nullable=False)
     role = Column(PgEnum(RoleEnum), nullable=False, default=RoleEnum.USER)
     created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
     is_active = Column(Boolean, default=True)
 
+    # Khoá sắp xếp của phân trang keyset (created_at, id)
+    __table_args__ = (
+        Index("ix_app_users_created_at_id", "created_at", "id"),
+    )
+
     courses = relationship("Course", back_populates="teacher")
     enrollments = relationship("CourseEnrollment", back_populates="user")
     quiz_attempts = relationship("QuizAttempt", back_populates="user")
@@ -45,6 +55,18 @@ class Course(Base):
         UUID(as_uuid=True), ForeignKey("app_users.id", ondelete="SET NULL")
     )
     created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
+    # Bộ đếm, cập nhật qua repositories.counters
+    member_count = Column(Integer, nullable=False, default=0,
+                          server_default="0")
+    quiz_count = Column(Integer, nullable=False, default=0,
+                        server_default="0")
+    # Tăng mỗi lần sửa course (ETag = version + các bộ đếm)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Khoá sắp xếp của phân trang keyset (created_at, id)
+    __table_args__ = (
+        Index("ix_courses_created_at_id", "created_at", "id"),
+    )
 
     teacher = relationship("AppUser", back_populates="courses")
     enrollments = relationship("CourseEnrollment", back_populates="course")
@@ -64,9 +86,15 @@ class CourseEnrollment(Base):
         UUID(as_uuid=True),
         ForeignKey("app_users.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     joined_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_course_enrollments_course_id_user_id",
+              "course_id", "user_id"),
+    )
+
     course = relationship("Course", back_populates="enrollments")
     user = relationship("AppUser", back_populates="enrollments")
 
@@ -90,6 +118,20 @@ class CourseQuiz(Base):
     total_points = Column(Integer)
     is_published = Column(Boolean, default=False, nullable=False)
     created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
+    # Bộ đếm, cập nhật qua repositories.counters
+    question_count = Column(Integer, nullable=False, default=0,
+                            server_default="0")
+    total_attempts = Column(Integer, nullable=False, default=0,
+                            server_default="0")
+    # Tăng mỗi lần sửa quiz (ETag = version + các bộ đếm)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Danh sách quiz của course theo keyset (created_at, id); cũng là
+    # index cho mọi query lọc theo course_id
+    __table_args__ = (
+        Index("ix_course_quizzes_course_id_created_at_id",
+              "course_id", "created_at", "id"),
+    )
 
     course = relationship("Course", back_populates="quizzes")
 
@@ -106,6 +148,13 @@ class CourseQuiz(Base):
         cascade="all, delete-orphan",
         passive_deletes=True,
     )
+    score_stats = relationship(
+        "QuizScoreStats",
+        back_populates="quiz",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 # Quiz Questions
@@ -124,6 +173,15 @@ class QuizQuestion(Base):
         default=QuestionType.SINGLE_CHOICE
     )
     points = Column(Integer, nullable=False)
+    # Thứ tự câu hỏi do giáo viên nhập (1, 2, ...), cấp khi insert
+    position = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Danh sách câu hỏi theo thứ tự (position, id); cũng là index cho
+    # mọi query lọc theo quiz_id
+    __table_args__ = (
+        Index("ix_quiz_questions_quiz_id_position_id",
+              "quiz_id", "position", "id"),
+    )
 
     quiz = relationship("CourseQuiz", back_populates="questions")
 
@@ -151,6 +209,7 @@ class QuestionOption(Base):
         UUID(as_uuid=True),
         ForeignKey("quiz_questions.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     content = Column(Text, nullable=False)
     is_correct = Column(Boolean, default=False, nullable=False)
@@ -181,10 +240,25 @@ class QuizAttempt(Base):
         nullable=False,
     )
     attempt_number = Column(Integer, nullable=False)
-    score = Column(Integer)
+    score = Column(Float)  # thang 10, 1 chữ số thập phân
     started_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
     finished_at = Column(TIMESTAMP)
 
+    # Unique (user, quiz, attempt_number) cũng là index cho các query
+    # theo user; (quiz, user): danh sách theo quiz, group theo user;
+    # (user|quiz, started_at, id): danh sách attempt theo keyset
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "quiz_id", "attempt_number",
+            name="uq_quiz_attempts_user_id_quiz_id_attempt_number",
+        ),
+        Index("ix_quiz_attempts_quiz_id_user_id", "quiz_id", "user_id"),
+        Index("ix_quiz_attempts_user_id_started_at_id",
+              "user_id", "started_at", "id"),
+        Index("ix_quiz_attempts_quiz_id_started_at_id",
+              "quiz_id", "started_at", "id"),
+    )
+
     user = relationship("AppUser", back_populates="quiz_attempts")
     quiz = relationship("CourseQuiz", back_populates="attempts")
 
@@ -206,6 +280,7 @@ class QuizAttemptAnswer(Base):
         UUID(as_uuid=True),
         ForeignKey("quiz_attempts.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     question_id = Column(
         UUID(as_uuid=True),
@@ -219,3 +294,55 @@ class QuizAttemptAnswer(Base):
     attempt = relationship("QuizAttempt", back_populates="answers")
     question = relationship("QuizQuestion", back_populates="answers")
     option = relationship("QuestionOption", back_populates="answers")
+
+
+# Quiz Score Statistics
+class QuizScoreStats(Base):
+    """
+    Thống kê điểm của một quiz, cập nhật dần mỗi lần nộp bài
+    (xem services.statistics) nên đọc không cần quét quiz_attempts.
+    """
+    __tablename__ = "quiz_score_stats"
+
+    quiz_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("course_quizzes.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+    mean = Column(Float, nullable=False, default=0, server_default="0")
+    # Tổng bình phương độ lệch so với mean (thuật toán Welford)
+    m2 = Column(Float, nullable=False, default=0, server_default="0")
+    min_score = Column(Float)
+    max_score = Column(Float)
+    # Số bài theo từng khoảng điểm, xem statistics.HISTOGRAM_BINS
+    histogram = Column(JSON, nullable=False, default=list)
+    updated_at = Column(TIMESTAMP)
+
+    quiz = relationship("CourseQuiz", back_populates="score_stats")
+
+
+# User Quiz Status
+class UserQuizStatus(Base):
+    """
+    Một dòng cho mỗi (user, quiz): bộ đếm cấp attempt_number và tóm tắt
+    kết quả, cập nhật bởi start/submit attempt (repositories.counters).
+    `last_*` là của lần làm mới nhất (None khi lần đó chưa nộp).
+    """
+    __tablename__ = "user_quiz_status"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("app_users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    quiz_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("course_quizzes.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    attempt_count = Column(Integer, nullable=False, default=0,
+                           server_default="0")
+    best_score = Column(Float)
+    last_score = Column(Float)
+    last_finished_at = Column(TIMESTAMP)
@@ -0,0 +1,16 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import AppUser
+from uuid import UUID
+
+
+async def get_user_by_id(db: AsyncSession, user_id: UUID):
+    return await db.get(AppUser, user_id)
+
+
+async def get_user_by_name_or_email(db: AsyncSession, value: str):
+    return await db.scalar(
+        select(AppUser).where(
+            (AppUser.full_name == value) | (AppUser.email == value)
+        )
+    )
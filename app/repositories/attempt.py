@@ -1,53 +1,172 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session, contains_eager
 from uuid import UUID
 from app.models.models import (
+    AppUser,
     QuizAttempt,
     QuizAttemptAnswer,
     QuizQuestion,
     QuestionOption,
     CourseQuiz,
+    QuizScoreStats,
 )
+from app.repositories import counters
 
 
 def get_quiz(db: Session, quiz_id: UUID):
     return db.query(CourseQuiz).filter(CourseQuiz.id == quiz_id).first()
 
 
-def count_user_attempts(db: Session, user_id: UUID, quiz_id: UUID) -> int:
-    return (
-        db.query(QuizAttempt)
-        .filter(QuizAttempt.user_id == user_id, QuizAttempt.quiz_id == quiz_id)
-        .count()
-    )
+def allocate_attempt_number(
+    db: Session, user_id: UUID, quiz_id: UUID, max_attempts: int | None
+) -> int | None:
+    """
+    Cấp attempt_number tiếp theo (một lệnh upsert, không đếm lại lịch sử).
+    Trả về None khi đã hết lượt. Không commit: dùng chung transaction
+    với `create_attempt`.
+    """
+    return db.execute(
+        counters.next_attempt_number(
+            db.get_bind().dialect.name, user_id, quiz_id, max_attempts)
+    ).scalar()
 
 
 def create_attempt(db: Session, attempt: QuizAttempt) -> QuizAttempt:
     db.add(attempt)
+    db.execute(counters.quiz_attempts(attempt.quiz_id, 1))
     db.commit()
     db.refresh(attempt)
     return attempt
 
 
+def finish_attempt(
+    db: Session, attempt: QuizAttempt, score: float, finished_at
+) -> bool:
+    """
+    Đánh dấu attempt đã nộp bằng một lệnh UPDATE có điều kiện
+    `finished_at IS NULL` (chưa commit). Hai lần nộp đồng thời thì lệnh
+    thứ hai chờ khoá dòng rồi không khớp dòng nào → trả về False.
+    Thành công thì `attempt` được cập nhật trong session, không cần flush.
+    """
+    result = db.execute(
+        update(QuizAttempt)
+        .where(QuizAttempt.id == attempt.id,
+               QuizAttempt.finished_at.is_(None))
+        .values(score=score, finished_at=finished_at)
+        .execution_options(synchronize_session="evaluate")
+    )
+    return result.rowcount == 1
+
+
+def record_attempt_result(db: Session, attempt: QuizAttempt):
+    """Cập nhật user_quiz_status theo attempt vừa nộp (chưa commit)."""
+    db.execute(
+        counters.record_attempt_result(
+            attempt.user_id, attempt.quiz_id, attempt.attempt_number,
+            attempt.score, attempt.finished_at,
+        )
+    )
+
+
 def get_attempt(db: Session, attempt_id: UUID) -> QuizAttempt | None:
     return db.query(QuizAttempt).filter(QuizAttempt.id == attempt_id).first()
 
 
-def save_answer(db: Session, answer: QuizAttemptAnswer):
-    db.add(answer)
+def get_attempt_detail(db: Session, attempt_id: UUID):
+    """
+    Attempt + answers + số câu hỏi của quiz (bộ đếm question_count)
+    trong một query. Trả về (attempt, question_count) hoặc None.
+    """
+    rows = (
+        db.query(QuizAttempt, CourseQuiz.question_count)
+        .join(CourseQuiz, CourseQuiz.id == QuizAttempt.quiz_id)
+        .outerjoin(QuizAttempt.answers)
+        .options(contains_eager(QuizAttempt.answers))
+        .filter(QuizAttempt.id == attempt_id)
+        .all()
+    )
+    return rows[0] if rows else None
+
+
+def bulk_save_answers(db: Session, rows: list[dict]):
+    """
+    Ghi tất cả câu trả lời của một attempt bằng một lệnh INSERT nhiều dòng.
+    """
+    if rows:
+        db.execute(insert(QuizAttemptAnswer), rows)
 
 
 def commit(db: Session):
     db.commit()
 
 
-def get_question(db: Session, question_id: UUID):
-    return db.query(
-        QuizQuestion).filter(QuizQuestion.id == question_id).first()
+def record_score(
+    db: Session, quiz_id: UUID, score: float, bin_index: int, bins: int
+) -> None:
+    """
+    Cộng điểm vào thống kê của quiz bằng một lệnh upsert (chưa commit).
+    Gọi ngay trước commit để khoá dòng thống kê được giữ ngắn nhất.
+    """
+    db.execute(
+        counters.record_score(
+            db.get_bind().dialect.name, quiz_id, score, bin_index, bins,
+            datetime.utcnow())
+    )
+
 
+def lock_score_stats(db: Session, quiz_id: UUID) -> QuizScoreStats:
+    """
+    Lấy thống kê điểm của quiz với SELECT ... FOR UPDATE (khoá tới khi
+    commit) để build lại (scripts.reconcile_counters). Quiz tạo trước khi
+    có bảng thống kê thì tạo dòng mới.
+    """
+    stats = (
+        db.query(QuizScoreStats)
+        .filter(QuizScoreStats.quiz_id == quiz_id)
+        .with_for_update()
+        .first()
+    )
+    if stats is None:
+        stats = QuizScoreStats(
+            quiz_id=quiz_id, count=0, mean=0.0, m2=0.0, histogram=[])
+        db.add(stats)
+    return stats
 
-def get_option(db: Session, option_id: UUID):
-    return db.query(
-        QuestionOption).filter(QuestionOption.id == option_id).first()
+
+def get_finished_scores(db: Session, quiz_id: UUID) -> list[float]:
+    """Điểm của các attempt đã nộp (dùng khi build lại thống kê)."""
+    return [
+        score for (score,) in db.query(QuizAttempt.score).filter(
+            QuizAttempt.quiz_id == quiz_id,
+            QuizAttempt.finished_at.isnot(None),
+            QuizAttempt.score.isnot(None),
+        )
+    ]
+
+
+def get_answer_key_rows(db: Session, quiz_id: UUID):
+    """
+    Lấy đáp án của quiz trong một query:
+    (is_published, question_id, points, option_id, is_correct) cho mỗi option.
+    Quiz chưa có câu hỏi trả về một dòng với question_id = None.
+    """
+    return (
+        db.query(
+            CourseQuiz.is_published,
+            QuizQuestion.id,
+            QuizQuestion.points,
+            QuestionOption.id,
+            QuestionOption.is_correct,
+        )
+        .outerjoin(QuizQuestion, QuizQuestion.quiz_id == CourseQuiz.id)
+        .outerjoin(
+            QuestionOption, QuestionOption.question_id == QuizQuestion.id
+        )
+        .filter(CourseQuiz.id == quiz_id)
+        .all()
+    )
 
 
 def list_attempts(
@@ -61,13 +180,41 @@ def list_attempts(
     return query
 
 
-def get_attempts_by_quiz(db: Session, quiz_id: str):
+def get_quiz_user_ids(db: Session, quiz_id: UUID):
     """
-    Lấy tất cả QuizAttempt theo quiz_id, order theo user_id và attempt_number
+    Query các user_id (không trùng) đã làm quiz, để phân trang trong SQL.
     """
     return (
-        db.query(QuizAttempt)
+        db.query(QuizAttempt.user_id)
         .filter(QuizAttempt.quiz_id == quiz_id)
+        .group_by(QuizAttempt.user_id)
+    )
+
+
+def get_attempts_of_users(
+    db: Session, quiz_id: UUID, user_ids: list[UUID]
+):
+    """
+    Các lần làm quiz của `user_ids` kèm tên user, trong 1 query,
+    order theo user_id và attempt_number.
+    """
+    if not user_ids:
+        return []
+    return (
+        db.query(
+            QuizAttempt.user_id,
+            AppUser.full_name,
+            QuizAttempt.id,
+            QuizAttempt.attempt_number,
+            QuizAttempt.score,
+            QuizAttempt.started_at,
+            QuizAttempt.finished_at,
+        )
+        .outerjoin(AppUser, AppUser.id == QuizAttempt.user_id)
+        .filter(
+            QuizAttempt.quiz_id == quiz_id,
+            QuizAttempt.user_id.in_(user_ids),
+        )
         .order_by(QuizAttempt.user_id, QuizAttempt.attempt_number)
         .all()
-    )
\ No newline at end of file
+    )
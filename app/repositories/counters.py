@@ -0,0 +1,253 @@
+"""
+Cột đếm (denormalized) trên Course, CourseQuiz, user_quiz_status và
+quiz_score_stats.
+
+Các hàm ở đây chỉ dựng câu lệnh (UPDATE / upsert); repository chạy chúng
+(`db.execute`) trong cùng transaction với thao tác ghi tương ứng. `col = col + delta` được tính trong DB nên an toàn khi
+nhiều request ghi đồng thời.
+"""
+import json
+from uuid import UUID
+
+from datetime import datetime
+
+from sqlalchemy import (
+    Float, Insert, Integer, JSON, String, Text, Update, bindparam, case,
+    cast, func, literal, select, update)
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.models import (
+    Course,
+    CourseEnrollment,
+    CourseQuiz,
+    QuizAttempt,
+    QuizQuestion,
+    QuizScoreStats,
+    UserQuizStatus,
+)
+
+
+def _bump(model, column, pk: UUID, delta: int) -> Update:
+    return (
+        update(model)
+        .where(model.id == pk)
+        .values({column: column + delta})
+        .execution_options(synchronize_session=False)
+    )
+
+
+def course_members(course_id: UUID, delta: int = 1) -> Update:
+    return _bump(Course, Course.member_count, course_id, delta)
+
+
+def course_quizzes(course_id: UUID, delta: int = 1) -> Update:
+    return _bump(Course, Course.quiz_count, course_id, delta)
+
+
+def quiz_questions(quiz_id: UUID, delta: int = 1) -> Update:
+    return _bump(CourseQuiz, CourseQuiz.question_count, quiz_id, delta)
+
+
+def quiz_attempts(quiz_id: UUID, delta: int = 1) -> Update:
+    return _bump(CourseQuiz, CourseQuiz.total_attempts, quiz_id, delta)
+
+
+def forget_user(user_id: UUID) -> list[Update]:
+    """
+    Trừ các bộ đếm trước khi xoá user (enrollments và attempts của user
+    bị xoá theo ON DELETE CASCADE).
+    """
+    user_attempts = (
+        select(func.count(QuizAttempt.id))
+        .where(
+            QuizAttempt.quiz_id == CourseQuiz.id,
+            QuizAttempt.user_id == user_id,
+        )
+        .scalar_subquery()
+    )
+    return [
+        update(Course)
+        .where(
+            Course.id.in_(
+                select(CourseEnrollment.course_id)
+                .where(CourseEnrollment.user_id == user_id)
+            )
+        )
+        .values(member_count=Course.member_count - 1)
+        .execution_options(synchronize_session=False),
+        update(CourseQuiz)
+        .where(
+            CourseQuiz.id.in_(
+                select(QuizAttempt.quiz_id)
+                .where(QuizAttempt.user_id == user_id)
+            )
+        )
+        .values(total_attempts=CourseQuiz.total_attempts - user_attempts)
+        .execution_options(synchronize_session=False),
+    ]
+
+
+def next_attempt_number(
+    dialect: str, user_id: UUID, quiz_id: UUID, max_attempts: int | None
+) -> Insert:
+    """
+    Cấp số thứ tự lần làm bài tiếp theo của (user, quiz) bằng một lệnh
+    upsert, RETURNING attempt_count mới.
+
+    Khi đã đạt `max_attempts` (None hoặc <= 0 là không giới hạn), nhánh
+    DO UPDATE bị WHERE chặn và lệnh không trả về dòng nào. Dòng
+    user_quiz_status bị khoá tới hết transaction nên các request đồng thời
+    nhận các số khác nhau. Lần làm mới chưa nộp nên `last_*` về None.
+    """
+    insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+    statement = insert(UserQuizStatus).values(
+        user_id=user_id, quiz_id=quiz_id, attempt_count=1
+    )
+    limited = max_attempts is not None and max_attempts > 0
+    return statement.on_conflict_do_update(
+        index_elements=[UserQuizStatus.user_id, UserQuizStatus.quiz_id],
+        set_={
+            "attempt_count": UserQuizStatus.attempt_count + 1,
+            "last_score": None,
+            "last_finished_at": None,
+        },
+        where=(UserQuizStatus.attempt_count < max_attempts
+               if limited else None),
+    ).returning(UserQuizStatus.attempt_count)
+
+
+def record_score(
+    dialect: str,
+    quiz_id: UUID,
+    score: float,
+    bin_index: int,
+    bins: int,
+    recorded_at: datetime,
+) -> Insert:
+    """
+    Cộng một điểm vào quiz_score_stats bằng một lệnh upsert: Welford
+    (count, mean, m2), min/max và ô `bin_index` của histogram đều tính
+    trong DB, không SELECT ... FOR UPDATE. Chưa có dòng thống kê thì
+    INSERT, nên hai lần nộp đầu tiên đồng thời không đụng khoá chính.
+
+    Histogram chưa đủ `bins` ô (dòng mới tạo, count = 0) được coi là
+    toàn số 0.
+    """
+    stats = QuizScoreStats
+    x = bindparam("score", score, type_=Float)
+    count = stats.count + 1
+    delta = x - stats.mean
+    mean = stats.mean + delta / count
+    zeros = json.dumps([0] * bins)
+    is_full = func.json_array_length(stats.histogram) == bins
+
+    if dialect == "sqlite":
+        insert = sqlite.insert
+        base = case((is_full, stats.histogram), else_=literal(zeros, String))
+        path = f"$[{bin_index}]"
+        histogram = func.json_set(
+            base, path, func.json_extract(base, path) + 1)
+    else:
+        insert = postgresql.insert
+        base = case(
+            (is_full, cast(stats.histogram, postgresql.JSONB)),
+            else_=cast(literal(zeros, String), postgresql.JSONB),
+        )
+        histogram = cast(
+            func.jsonb_set(
+                base,
+                cast(postgresql.array([str(bin_index)]),
+                     postgresql.ARRAY(Text)),
+                func.to_jsonb(
+                    cast(base.op("->>")(bin_index), Integer) + 1),
+            ),
+            JSON,
+        )
+
+    first = [0] * bins
+    first[bin_index] = 1
+    return insert(stats).values(
+        quiz_id=quiz_id, count=1, mean=x, m2=0.0,
+        min_score=x, max_score=x, histogram=first, updated_at=recorded_at,
+    ).on_conflict_do_update(
+        index_elements=[stats.quiz_id],
+        set_={
+            # Vế phải của SET đều đọc giá trị cũ của dòng
+            "count": count,
+            "mean": mean,
+            "m2": stats.m2 + delta * (x - mean),
+            "min_score": case(
+                (stats.min_score.is_(None) | (stats.min_score > x), x),
+                else_=stats.min_score),
+            "max_score": case(
+                (stats.max_score.is_(None) | (stats.max_score < x), x),
+                else_=stats.max_score),
+            "histogram": histogram,
+            "updated_at": recorded_at,
+        },
+    )
+
+
+def record_attempt_result(
+    user_id: UUID,
+    quiz_id: UUID,
+    attempt_number: int,
+    score: float,
+    finished_at: datetime,
+) -> Update:
+    """
+    Cập nhật tóm tắt user_quiz_status khi nộp bài: best_score luôn,
+    `last_*` chỉ khi đây là lần làm mới nhất.
+    """
+    status = UserQuizStatus
+    is_latest = status.attempt_count == attempt_number
+    return (
+        update(status)
+        .where(status.user_id == user_id, status.quiz_id == quiz_id)
+        .values(
+            best_score=case(
+                (status.best_score.is_(None) | (status.best_score < score),
+                 score),
+                else_=status.best_score,
+            ),
+            last_score=case((is_latest, score), else_=status.last_score),
+            last_finished_at=case(
+                (is_latest, finished_at), else_=status.last_finished_at),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+# (tên, model, cột đếm, bảng con, khoá ngoại tới model)
+COUNTERS = [
+    ("courses.member_count", Course, Course.member_count,
+     CourseEnrollment, CourseEnrollment.course_id),
+    ("courses.quiz_count", Course, Course.quiz_count,
+     CourseQuiz, CourseQuiz.course_id),
+    ("course_quizzes.question_count", CourseQuiz, CourseQuiz.question_count,
+     QuizQuestion, QuizQuestion.quiz_id),
+    ("course_quizzes.total_attempts", CourseQuiz, CourseQuiz.total_attempts,
+     QuizAttempt, QuizAttempt.quiz_id),
+]
+
+
+def reconcile_statements() -> list[tuple[str, Update]]:
+    """
+    Với mỗi bộ đếm: UPDATE lại giá trị thật (COUNT) cho các dòng bị lệch.
+    """
+    statements = []
+    for name, model, column, child, fk in COUNTERS:
+        actual = (
+            select(func.count(child.id)).where(fk == model.id)
+            .scalar_subquery()
+        )
+        statements.append(
+            (
+                name,
+                update(model)
+                .where(column != actual)
+                .values({column: actual})
+                .execution_options(synchronize_session=False),
+            )
+        )
+    return statements
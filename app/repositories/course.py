@@ -5,6 +5,7 @@ from app.schemas.course import CourseCreate, CourseUpdate
 from uuid import UUID
 from app.models.models import CourseEnrollment
 from app.models.models import CourseQuiz
+from app.repositories import counters
 
 
 def get_course_by_name(db: Session, name: str):
@@ -23,6 +24,18 @@ def get_course_by_id(db: Session, course_id: UUID):
     return db.query(Course).filter(Course.id == course_id).first()
 
 
+def get_course_version(db: Session, course_id: UUID):
+    """
+    (version, member_count, quiz_count) của course để tính ETag:
+    chỉ đọc 3 cột theo khoá chính. None nếu không có course.
+    """
+    return (
+        db.query(Course.version, Course.member_count, Course.quiz_count)
+        .filter(Course.id == course_id)
+        .first()
+    )
+
+
 def get_enrolled_courses(db: Session, user_id: UUID):
     return (
         db.query(Course)
@@ -48,6 +61,7 @@ def create_enrollment(
         db: Session, enrollment: CourseEnrollment
 ) -> CourseEnrollment:
     db.add(enrollment)
+    db.execute(counters.course_members(enrollment.course_id, 1))
     db.commit()
     db.refresh(enrollment)
     return enrollment
@@ -64,11 +78,20 @@ def create_course(db: Session, course_in: CourseCreate):
 def update_course(db: Session, course: Course, course_in: CourseUpdate):
     for field, value in course_in.model_dump(exclude_unset=True).items():
         setattr(course, field, value)
+    # Tăng trong SQL: không mất lượt tăng khi sửa đồng thời
+    course.version = Course.version + 1
     db.commit()
     db.refresh(course)
     return course
 
 
+def get_course_quiz_ids(db: Session, course_id: UUID) -> list[UUID]:
+    return [
+        quiz_id for (quiz_id,) in
+        db.query(CourseQuiz.id).filter(CourseQuiz.course_id == course_id)
+    ]
+
+
 def delete_course(db: Session, course: Course) -> bool:
     """
     Xóa course và tất cả dữ liệu liên quan: quizzes, enrollments
@@ -90,5 +113,6 @@ def delete_course(db: Session, course: Course) -> bool:
 
 
 def delete_enrollment(db: Session, enrollment: CourseEnrollment):
+    db.execute(counters.course_members(enrollment.course_id, -1))
     db.delete(enrollment)
     db.commit()
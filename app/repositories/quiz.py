@@ -1,8 +1,16 @@
-from sqlalchemy.orm import Session
+import csv
+import io
+from sqlalchemy import and_, insert
+from sqlalchemy.orm import Session, selectinload
 from uuid import UUID
-from app.models.models import CourseQuiz, QuizQuestion, QuestionOption
+from app.models.models import (
+    CourseQuiz, QuizQuestion, QuestionOption, QuizScoreStats, UserQuizStatus)
 from app.schemas.quiz import QuizCreate, QuizUpdate, QuestionCreate
-from typing import List
+from app.common.cache import answer_key_cache
+from app.repositories import counters
+from app.core.config import QUESTION_BULK_MODE
+from app.constants.enums.questionType import QuestionType
+from typing import Iterable, List
 import uuid
 
 
@@ -17,58 +25,216 @@ def create_quiz(db: Session, quiz_in: QuizCreate, teacher_id: UUID):
         total_points=quiz_in.total_points,
         is_published=quiz_in.is_published,
     )
+    # Dòng thống kê điểm tạo cùng quiz, submit chỉ cần khoá và cập nhật
+    quiz.score_stats = QuizScoreStats()
     db.add(quiz)
+    db.execute(counters.course_quizzes(quiz.course_id, 1))
     db.commit()
     db.refresh(quiz)  # cần dòng này
     return quiz
 
 
+def build_question_rows(
+    quiz_id: UUID, questions: Iterable[dict], start_position: int = 1
+) -> tuple[List[dict], List[dict], List[dict]]:
+    """
+    Sinh sẵn id ở client và tách câu hỏi thành 2 danh sách row để insert.
+    Câu hỏi được đánh position liên tiếp từ `start_position` theo thứ tự
+    nhập.
+
+    `questions` là dict dạng {content, type, points, options:
+    [{content, is_correct}]} (output của parser hoặc QuestionCreate đã
+    model_dump).
+
+    Returns:
+        tuple: (question_rows, option_rows, created) với `created` là các
+        câu hỏi kèm options, dùng để trả về response mà không cần query lại.
+    """
+    question_rows = []
+    option_rows = []
+    created = []
+    for position, q in enumerate(questions, start_position):
+        question_type = q.get("type")
+        if not isinstance(question_type, str):
+            question_type = QuestionType.SINGLE_CHOICE
+        row = {
+            "id": uuid.uuid4(),
+            "quiz_id": quiz_id,
+            "content": q["content"],
+            "type": question_type,
+            "points": q.get("points", 1),
+            "position": position,
+        }
+        options = [
+            {
+                "id": uuid.uuid4(),
+                "question_id": row["id"],
+                "content": opt["content"],
+                "is_correct": opt.get("is_correct", False),
+            }
+            for opt in q.get("options", [])
+        ]
+        question_rows.append(row)
+        option_rows.extend(options)
+        created.append({**row, "options": options})
+    return question_rows, option_rows, created
+
+
+def _copy_rows(db: Session, table, rows: List[dict]) -> None:
+    """
+    COPY ... FROM STDIN (CSV) qua connection psycopg2 của session,
+    nằm trong cùng transaction với session.
+    """
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    # QUOTE_NONNUMERIC: chuỗi rỗng "" khác NULL
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for row in rows:
+        writer.writerow(
+            [str(row[c]) if isinstance(row[c], uuid.UUID) else row[c]
+             for c in columns]
+        )
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def bulk_insert_questions(
+    db: Session, quiz_id: UUID, questions: Iterable[dict]
+) -> List[dict]:
+    """
+    Insert câu hỏi + options bằng 2 câu lệnh nhiều dòng (id sinh sẵn ở
+    client nên không cần flush), hoặc COPY khi QUESTION_BULK_MODE=copy
+    trên PostgreSQL. Không commit: caller quản lý transaction.
+
+    Position được cấp từ bộ đếm question_count: UPDATE ... RETURNING khoá
+    dòng quiz tới khi commit nên các lô thêm đồng thời không trùng nhau.
+
+    Returns:
+        List[dict]: Các câu hỏi đã insert, kèm options.
+    """
+    questions = list(questions)
+    start_position = 1
+    if questions:
+        question_count = db.execute(
+            counters.quiz_questions(quiz_id, len(questions))
+            .returning(CourseQuiz.question_count)
+        ).scalar()
+        if question_count is not None:
+            start_position = question_count - len(questions) + 1
+    question_rows, option_rows, created = build_question_rows(
+        quiz_id, questions, start_position)
+    use_copy = (
+        QUESTION_BULK_MODE == "copy"
+        and db.get_bind().dialect.name == "postgresql"
+    )
+
+    for model, rows in (
+        (QuizQuestion, question_rows), (QuestionOption, option_rows)
+    ):
+        if not rows:
+            continue
+        if use_copy:
+            _copy_rows(db, model.__table__, rows)
+        else:
+            db.execute(insert(model), rows)
+    return created
+
+
 def add_questions_to_quiz(
     db: Session, quiz_id: UUID,
     questions: List[QuestionCreate]
-):
-    created_questions = []
-    for q in questions:
-        question = QuizQuestion(
-            id=uuid.uuid4(),
-            quiz_id=quiz_id,
-            content=q.content,
-            type=q.type,
-            points=q.points,
-        )
-        db.add(question)
-        db.flush()
-
-        for opt in q.options:
-            option = QuestionOption(
-                id=uuid.uuid4(),
-                question_id=question.id,
-                content=opt.content,
-                is_correct=opt.is_correct,
-            )
-            db.add(option)
+) -> List[dict]:
+    created = bulk_insert_questions(
+        db, quiz_id, [q.model_dump() for q in questions]
+    )
+    commit_questions(db, quiz_id)
+    return created
 
-        created_questions.append(question)
 
+def commit_questions(db: Session, quiz_id: UUID) -> None:
     db.commit()
-    return created_questions
+    answer_key_cache.invalidate(quiz_id)
 
 
 def repo_get_questions(db: Session, quiz_id: UUID):
     """
     Trả về query object để service xử lý tiếp (phân trang).
+    Options được nạp kèm bằng một query IN cho cả trang.
     """
-    return db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id)
+    return (
+        db.query(QuizQuestion)
+        .options(selectinload(QuizQuestion.options))
+        .filter(QuizQuestion.quiz_id == quiz_id)
+    )
+
+
+def get_quiz_with_questions(db: Session, quiz_id: UUID) -> CourseQuiz | None:
+    """
+    Quiz + toàn bộ câu hỏi + options trong 3 query
+    (quiz, câu hỏi IN, options IN), không phụ thuộc số câu hỏi.
+    """
+    return (
+        db.query(CourseQuiz)
+        .options(
+            selectinload(CourseQuiz.questions)
+            .selectinload(QuizQuestion.options)
+        )
+        .filter(CourseQuiz.id == quiz_id)
+        .first()
+    )
 
 
 def get_quiz(db: Session, quiz_id: UUID) -> CourseQuiz | None:
     return db.query(CourseQuiz).filter(CourseQuiz.id == quiz_id).first()
 
 
+def get_quiz_version(db: Session, quiz_id: UUID):
+    """
+    (version, question_count, total_attempts) của quiz để tính ETag:
+    chỉ đọc 3 cột theo khoá chính, không nạp ORM. None nếu không có quiz.
+    """
+    return (
+        db.query(CourseQuiz.version, CourseQuiz.question_count,
+                 CourseQuiz.total_attempts)
+        .filter(CourseQuiz.id == quiz_id)
+        .first()
+    )
+
+
+def get_score_stats(db: Session, quiz_id: UUID) -> QuizScoreStats | None:
+    return db.get(QuizScoreStats, quiz_id)
+
+
 def list_quizzes(db: Session, course_id: UUID) -> list[CourseQuiz]:
     return db.query(CourseQuiz).filter(CourseQuiz.course_id == course_id)
 
 
+def list_quizzes_with_status(db: Session, course_id: UUID, user_id: UUID):
+    """
+    Quiz của course kèm user_quiz_status của `user_id` (LEFT JOIN theo
+    khoá chính, None khi user chưa làm quiz).
+    """
+    return (
+        list_quizzes(db, course_id)
+        .outerjoin(
+            UserQuizStatus,
+            and_(
+                UserQuizStatus.quiz_id == CourseQuiz.id,
+                UserQuizStatus.user_id == user_id,
+            ),
+        )
+        .add_columns(UserQuizStatus)
+    )
+
+
 def update_quiz(
     db: Session,
     quiz: CourseQuiz,
@@ -76,11 +242,17 @@ def update_quiz(
 ) -> CourseQuiz:
     for field, value in quiz_in.dict(exclude_unset=True).items():
         setattr(quiz, field, value)
+    # Tăng trong SQL: không mất lượt tăng khi sửa đồng thời
+    quiz.version = CourseQuiz.version + 1
     db.commit()
+    answer_key_cache.invalidate(quiz.id)
     db.refresh(quiz)
     return quiz
 
 
 def delete_quiz(db: Session, quiz: CourseQuiz):
+    quiz_id = quiz.id
+    db.execute(counters.course_quizzes(quiz.course_id, -1))
     db.delete(quiz)
     db.commit()
+    answer_key_cache.invalidate(quiz_id)
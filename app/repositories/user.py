@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from app.models.models import AppUser, CourseEnrollment
+from app.repositories import counters
 from uuid import UUID
 
 
@@ -36,6 +37,8 @@ def update_user(db: Session, db_user: AppUser, updates: dict):
 
 
 def delete_user(db: Session, db_user: AppUser):
+    for statement in counters.forget_user(db_user.id):
+        db.execute(statement)
     db.delete(db_user)
     db.commit()
     return db_user
@@ -1,5 +1,7 @@
 from fastapi import APIRouter
+from app.core.config import DB_ASYNC_MODE
 from app.routers import user, course, quiz, attempt, auth, pdf_parser
+from app.routers import health
 
 api_router = APIRouter()
 
@@ -11,6 +13,14 @@ api_router.include_router(quiz.router, prefix="/app", tags=["Quizzes"])
 api_router.include_router(
     pdf_parser.router, prefix="/app", tags=["PDF Parser"]
 )
+api_router.include_router(health.router, prefix="/app", tags=["Health"])
+# Attempts là endpoint nóng nhất của học sinh → dùng router async nếu bật
+# (import có điều kiện: chế độ sync không cần greenlet / asyncpg)
+if DB_ASYNC_MODE:
+    from app.routers import attempt_async
+    attempt_router = attempt_async.router
+else:
+    attempt_router = attempt.router
 api_router.include_router(
-    attempt.router, prefix="/app", tags=["Attempts"]
+    attempt_router, prefix="/app", tags=["Attempts"]
 )
@@ -22,9 +22,11 @@ router = APIRouter(prefix="/attempts", tags=["Attempts"])
 @router.get("/by_quiz/{quiz_id}",
             response_model=PaginationResponse[QuizAttemptByUser])
 def get_quiz_attempts_by_quiz(
-    quiz_id: str,
+    quiz_id: UUID,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="Cursor from next_cursor (keyset pagination)"),
     db: Session = Depends(get_db),
     _: AppUser = Depends(get_current_user),
 ):
@@ -32,7 +34,8 @@ def get_quiz_attempts_by_quiz(
     Lấy danh sách học sinh có phân trang,
     kèm tất cả lần làm bài của từng học sinh
     """
-    pagination = PaginationRequest(page=page, page_size=page_size)
+    pagination = PaginationRequest(
+        page=page, page_size=page_size, cursor=cursor)
     return service.get_attempts_grouped_by_user_paginated(
         db, quiz_id, pagination
     )
@@ -75,5 +78,9 @@ def list_attempts(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100,
                            description="Number of items per page"),
+    cursor: str | None = Query(
+        None, description="Cursor from next_cursor (keyset pagination)"),
 ):
-    return service.list_attempts(user_id, quiz_id, db, page, page_size)
+    return service.list_attempts(
+        user_id, quiz_id, db, page, page_size, cursor
+    )
@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app.database.session import get_async_db
+from app.schemas.attempt import (
+    QuizAttemptCreate,
+    QuizAttemptAnswerCreate,
+    QuizAttemptResponse,
+    QuizAttemptDetailResponse,
+    QuizAttemptByUser,
+)
+from app.services import attempt as service
+from app.dependencies.async_dependencies import get_current_user_async
+from app.models.models import AppUser
+from app.common.pagination import PaginationResponse, PaginationRequest
+
+
+# Router attempts cho chế độ DB_ASYNC_MODE.
+# Service đồng bộ được chạy qua AsyncSession.run_sync: ORM chạy trong
+# greenlet trên kết nối asyncpg, không chiếm thread của thread pool.
+router = APIRouter(prefix="/attempts", tags=["Attempts"])
+
+
+@router.get("/by_quiz/{quiz_id}",
+            response_model=PaginationResponse[QuizAttemptByUser])
+async def get_quiz_attempts_by_quiz(
+    quiz_id: UUID,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="Cursor from next_cursor (keyset pagination)"),
+    db: AsyncSession = Depends(get_async_db),
+    _: AppUser = Depends(get_current_user_async),
+):
+    """
+    Lấy danh sách học sinh có phân trang,
+    kèm tất cả lần làm bài của từng học sinh
+    """
+    pagination = PaginationRequest(
+        page=page, page_size=page_size, cursor=cursor)
+    return await db.run_sync(
+        service.get_attempts_grouped_by_user_paginated, quiz_id, pagination
+    )
+
+
+@router.post("/", response_model=QuizAttemptResponse)
+async def start_attempt(
+    payload: QuizAttemptCreate,
+    db: AsyncSession = Depends(get_async_db),
+    _: AppUser = Depends(get_current_user_async),
+):
+    return await db.run_sync(lambda s: service.start_attempt(payload, s))
+
+
+@router.post("/{attempt_id}/submit", response_model=QuizAttemptDetailResponse)
+async def submit_attempt(
+    attempt_id: UUID,
+    answers: list[QuizAttemptAnswerCreate],
+    db: AsyncSession = Depends(get_async_db),
+    _: AppUser = Depends(get_current_user_async),
+):
+    return await db.run_sync(
+        lambda s: service.submit_attempt(attempt_id, answers, s)
+    )
+
+
+@router.get("/{attempt_id}", response_model=QuizAttemptDetailResponse)
+async def get_attempt(
+    attempt_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    _: AppUser = Depends(get_current_user_async),
+):
+    return await db.run_sync(lambda s: service.get_attempt(attempt_id, s))
+
+
+@router.get("/", response_model=PaginationResponse[QuizAttemptResponse])
+async def list_attempts(
+    user_id: UUID | None = None,
+    quiz_id: UUID | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    _: AppUser = Depends(get_current_user_async),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(10, ge=1, le=100,
+                           description="Number of items per page"),
+    cursor: str | None = Query(
+        None, description="Cursor from next_cursor (keyset pagination)"),
+):
+    return await db.run_sync(
+        lambda s: service.list_attempts(
+            user_id, quiz_id, s, page, page_size, cursor
+        )
+    )
@@ -1,5 +1,5 @@
 # app/api/v1/course.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.database.session import get_db
@@ -9,6 +9,7 @@ from app.services import course as service
 from app.dependencies.dependencies import get_current_user
 from app.models.models import AppUser
 from app.common.pagination import PaginationResponse
+from app.common.etag import etag_matches, not_modified
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
@@ -18,10 +19,14 @@ def list_courses(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(
         10, ge=1, le=100, description="Number of items per page"),
+    cursor: str | None = Query(
+        None, description="Cursor from next_cursor (keyset pagination)"),
     db: Session = Depends(get_db),
     _: AppUser = Depends(get_current_user),
 ):
-    return service.list_courses(db, page=page, page_size=page_size)
+    return service.list_courses(
+        db, page=page, page_size=page_size, cursor=cursor
+    )
 
 
 @router.get("/enrolled", response_model=PaginationResponse[CourseOut])
@@ -29,6 +34,8 @@ def list_enrolled_courses(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(
         10, ge=1, le=100, description="Number of items per page"),
+    cursor: str | None = Query(
+        None, description="Cursor from next_cursor (keyset pagination)"),
     db: Session = Depends(get_db),
     user: AppUser = Depends(get_current_user),
 ):
@@ -36,16 +43,26 @@ def list_enrolled_courses(
         raise HTTPException(status_code=401, detail="Authentication required")
 
     return service.list_enrolled_courses(
-        db, page=page, page_size=page_size, user_id=user.id
+        db, page=page, page_size=page_size, user_id=user.id, cursor=cursor
     )
 
 
 @router.get("/{course_id}", response_model=CourseOut)
 def get_course(
     course_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     _: AppUser = Depends(get_current_user),
 ):
+    # ETag khớp If-None-Match → 304, không nạp course
+    etag = service.get_course_etag(db, course_id)
+    if not etag:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     course = service.get_course(db, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
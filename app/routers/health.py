@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+
+from app.database.session import get_pool_stats
+from app.dependencies.dependencies import get_current_user
+from app.models.models import AppUser
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/db-pool")
+def db_pool_stats(_: AppUser = Depends(get_current_user)):
+    """
+    Số liệu connection pool: số kết nối đang dùng, overflow,
+    thời gian chờ và độ trễ checkout. Dùng để chọn DB_POOL_SIZE.
+    """
+    return get_pool_stats()
@@ -1,20 +1,81 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-import shutil
+import asyncio
+import hashlib
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import uuid
 import os
-from app.utils.pdf_parser import parse_pdf_to_questions
+from uuid import UUID
+from app.common.response import json_dumps
+from app.core.config import PDF_MAX_UPLOAD_BYTES
+from app.database.session import SessionLocal, get_db
+from app.services import quiz as quiz_service
+from app.utils import pdf_cache
+from app.utils.pdf_pool import iter_pdf_job, run_pdf_job
 from app.dependencies.dependencies import get_current_user
-from app.models.models import AppUser
+from app.models.models import AppUser, RoleEnum
 
 router = APIRouter(prefix="/pdf", tags=["PDF Parser"])
 
 UPLOAD_DIR = "uploads/pdf"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+CHUNK_SIZE = 1024 * 1024
+IMPORT_BATCH_SIZE = 100
+
+
+async def save_upload(file: UploadFile, file_path: str) -> str:
+    """
+    Ghi file upload ra đĩa theo từng chunk, giới hạn PDF_MAX_UPLOAD_BYTES.
+    Trả về sha256 (hex) của nội dung file.
+    """
+    if file.size is not None and file.size > PDF_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    size = 0
+    digest = hashlib.sha256()
+    buffer = await run_in_threadpool(open, file_path, "wb")
+    try:
+        while chunk := await file.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > PDF_MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="File too large")
+            digest.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+    finally:
+        await run_in_threadpool(buffer.close)
+    return digest.hexdigest()
+
+
+def remove_upload(file_path: str) -> None:
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+
+async def stream_questions(file_path: str, digest: str):
+    """
+    NDJSON: mỗi dòng một câu hỏi, gửi ngay khi worker parse xong.
+    Lỗi giữa chừng được báo ở dòng cuối dưới dạng {"error": ...}.
+    """
+    try:
+        async for batch in iter_pdf_job(
+            pdf_cache.parse_and_cache_to_queue, file_path, digest
+        ):
+            yield b"".join(json_dumps(q) + b"\n" for q in batch)
+    except asyncio.TimeoutError:
+        yield json_dumps({"error": "PDF parsing timed out"}) + b"\n"
+    except Exception as e:
+        yield json_dumps({"error": str(e)}) + b"\n"
+    finally:
+        await run_in_threadpool(remove_upload, file_path)
+
 
 @router.post("/parse")
 async def parse_pdf(
     file: UploadFile = File(...),
+    stream: bool = Query(
+        False, description="Stream questions as NDJSON while parsing"),
     _: AppUser = Depends(get_current_user),
 ):
     """
@@ -24,13 +85,120 @@ async def parse_pdf(
         raise HTTPException(status_code=400, detail="File must be PDF")
 
     file_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}.pdf")
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    if stream:
+        try:
+            digest = await save_upload(file, file_path)
+            # ✅ File đã parse trước đó → trả thẳng file NDJSON đã cache
+            cached_path = await run_in_threadpool(
+                pdf_cache.get_cached_path, digest)
+        except BaseException:
+            remove_upload(file_path)
+            raise
+        if cached_path is not None:
+            remove_upload(file_path)
+            return FileResponse(cached_path, media_type="application/x-ndjson")
+        return StreamingResponse(
+            stream_questions(file_path, digest),
+            media_type="application/x-ndjson",
+        )
 
     try:
-        questions = parse_pdf_to_questions(file_path)
+        digest = await save_upload(file, file_path)
+        questions = await run_in_threadpool(pdf_cache.load_questions, digest)
+        if questions is None:
+            # ✅ Parse trong process riêng → event loop không bị chặn
+            questions = await run_pdf_job(
+                pdf_cache.parse_and_cache, file_path, digest)
         return {"questions": questions}
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="PDF parsing timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        os.remove(file_path)
+        remove_upload(file_path)
+
+
+async def iter_question_batches(file_path: str, digest: str):
+    """
+    Các lô câu hỏi của file: lấy từ cache nếu có, nếu không thì parse
+    trong process riêng.
+    """
+    cached = await run_in_threadpool(pdf_cache.load_questions, digest)
+    if cached is None:
+        async for batch in iter_pdf_job(
+            pdf_cache.parse_and_cache_to_queue, file_path, digest
+        ):
+            yield batch
+        return
+    for i in range(0, len(cached), IMPORT_BATCH_SIZE):
+        yield cached[i:i + IMPORT_BATCH_SIZE]
+
+
+async def import_questions(quiz_id: UUID, file_path: str, digest: str):
+    """
+    NDJSON tiến độ: {"parsed": n} sau mỗi lô parse xong, dòng cuối
+    {"imported": n, "done": true} hoặc {"error": ...}.
+
+    Parse hết file trước rồi mới mở session: việc ghi DB (một lần tăng
+    question_count + insert + commit) chỉ nằm ở bước cuối, nên không giữ
+    khoá dòng quiz hay connection của pool trong lúc parse.
+    """
+    questions = []
+    try:
+        async for batch in iter_question_batches(file_path, digest):
+            questions.extend(batch)
+            yield json_dumps({"parsed": len(questions)}) + b"\n"
+    except asyncio.TimeoutError:
+        yield json_dumps({"error": "PDF parsing timed out"}) + b"\n"
+        return
+    except Exception as e:
+        yield json_dumps({"error": str(e)}) + b"\n"
+        return
+    finally:
+        await run_in_threadpool(remove_upload, file_path)
+
+    db: Session = SessionLocal()
+    try:
+        imported = await run_in_threadpool(
+            quiz_service.import_questions, db, quiz_id, questions
+        )
+        yield json_dumps({"imported": imported, "done": True}) + b"\n"
+    except Exception as e:
+        await run_in_threadpool(db.rollback)
+        yield json_dumps({"error": str(e)}) + b"\n"
+    finally:
+        await run_in_threadpool(db.close)
+
+
+@router.post("/import/{quiz_id}")
+async def import_pdf(
+    quiz_id: UUID,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """
+    Upload file PDF, parse và thêm thẳng các câu hỏi vào quiz.
+    Trả về tiến độ dạng NDJSON. Chỉ giáo viên mới có quyền.
+    """
+    if current_user.role != RoleEnum.TEACHER:
+        raise HTTPException(status_code=403,
+                            detail="Only teachers can add questions")
+    if not file.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="File must be PDF")
+    quiz = await run_in_threadpool(quiz_service.get_quiz, db, quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+
+    file_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}.pdf")
+    try:
+        digest = await save_upload(file, file_path)
+    except BaseException:
+        remove_upload(file_path)
+        raise
+    return StreamingResponse(
+        import_questions(quiz_id, file_path, digest),
+        media_type="application/x-ndjson",
+    )
@@ -1,16 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List
 
 from app.database.session import get_db
 from app.schemas.quiz import (
-    QuizCreate, QuizUpdate, QuizResponse, QuestionCreate, QuestionResponse)
+    QuizCreate, QuizUpdate, QuizResponse, QuestionCreate, QuestionResponse,
+    QuizStatisticsResponse, QuizBundleResponse)
 from app.services import quiz as quiz_service
+from app.services import statistics as statistics_service
 from app.dependencies.dependencies import get_current_user
 from app.models.models import AppUser
 from app.common.pagination import PaginationResponse
 from app.models.models import RoleEnum
+from app.common.etag import etag_matches, not_modified
 
 router = APIRouter(prefix="/quizzes", tags=["Quizzes"])
 
@@ -22,6 +25,8 @@ def list_quizzes(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, 
                            description="Number of items per page"),
+    cursor: str | None = Query(
+        None, description="Cursor from next_cursor (keyset pagination)"),
     db: Session = Depends(get_db),
     current_user: AppUser = Depends(get_current_user),
     # Đổi tên biến cho rõ nghĩa
@@ -36,39 +41,93 @@ def list_quizzes(
         course_id=course_id,
         user_id=current_user.id,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
     )
 
 
 @router.get("/{quiz_id}", response_model=QuizResponse)
 def get_quiz(
     quiz_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     _: AppUser = Depends(get_current_user),
 ):
     """
     Lấy chi tiết một quiz theo ID.
+    Hỗ trợ If-None-Match: ETag khớp → 304, không nạp quiz.
     """
+    etag = quiz_service.get_quiz_etag(db, quiz_id)
+    if not etag:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     quiz = quiz_service.get_quiz(db, quiz_id)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     return quiz
 
 
+@router.get("/{quiz_id}/bundle", response_model=QuizBundleResponse)
+def get_quiz_bundle(
+    quiz_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """
+    Toàn bộ quiz (câu hỏi + options, không có đáp án đúng) trong một
+    request, cho học sinh khi bắt đầu làm bài.
+    """
+    blob = quiz_service.get_quiz_bundle(
+        db, quiz_id, current_user.role == RoleEnum.TEACHER)
+    # JSON đã mã hoá sẵn: trả nguyên bytes, không qua response_model
+    return Response(content=blob, media_type="application/json")
+
+
+@router.get("/{quiz_id}/statistics", response_model=QuizStatisticsResponse)
+def get_quiz_statistics(
+    quiz_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """
+    Thống kê điểm của quiz (số bài, trung bình, phương sai, min/max,
+    histogram). Đọc một dòng đã tính sẵn, không quét quiz_attempts.
+    """
+    if current_user.role != RoleEnum.TEACHER:
+        raise HTTPException(status_code=403,
+                            detail="Only teachers can view statistics")
+    return statistics_service.get_quiz_statistics(db, quiz_id)
+
+
 @router.get("/{quiz_id}/questions",
             response_model=PaginationResponse[QuestionResponse])
 def get_questions_by_quiz(
     quiz_id: UUID,
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: str | None = Query(
+        None, description="Cursor from next_cursor (keyset pagination)"),
     db: Session = Depends(get_db),
     _: AppUser = Depends(get_current_user),
 ):
     """
     Lấy danh sách câu hỏi trong một quiz (có phân trang).
+    Hỗ trợ If-None-Match: ETag khớp → 304, không query câu hỏi.
     """
+    etag = quiz_service.get_questions_etag(db, quiz_id, request.url.query)
+    if etag:
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+
     return quiz_service.get_questions_by_quiz(
-        db, quiz_id=quiz_id, page=page, page_size=page_size
+        db, quiz_id=quiz_id, page=page, page_size=page_size, cursor=cursor
     )
 
 
@@ -19,11 +19,13 @@ def get_all_users(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(
         10, ge=1, le=100, description="Number of items per page"),
+    cursor: str | None = Query(
+        None, description="Cursor from next_cursor (keyset pagination)"),
     db: Session = Depends(get_db),
     _: AppUser = Depends(get_current_user)
 ):
     return app.services.user.get_all_users_service(
-        db, page=page, page_size=page_size)
+        db, page=page, page_size=page_size, cursor=cursor)
 
 
 @router.get(
@@ -34,11 +36,14 @@ def list_users_in_course(
     course_id: str,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: str | None = Query(
+        None, description="Cursor from next_cursor (keyset pagination)"),
     db: Session = Depends(get_db),
     _: AppUser = Depends(get_current_user)  # optional auth
 ):
     return app.services.user.get_all_users_in_course(
-        db, course_id=course_id, page=page, page_size=page_size
+        db, course_id=course_id, page=page, page_size=page_size,
+        cursor=cursor
     )
 
 
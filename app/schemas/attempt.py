@@ -48,7 +48,7 @@ class QuizAttemptDetailResponse(QuizAttemptResponse):
 class QuizAttemptItem(BaseModel):
     attempt_id: str
     attempt_number: int
-    score: int | None
+    score: float | None
     started_at: str
     finished_at: str | None
 
@@ -36,11 +36,32 @@ class QuizResponse(QuizBase):
     attempt_count: Optional[int] = 0
     remaining_attempts: Optional[int] = 0
     latest_attempt_finished_at: Optional[datetime] = None
+    best_score: Optional[float] = None
+    last_score: Optional[float] = None
+    question_count: Optional[int] = 0
+    total_attempts: Optional[int] = 0
 
     class Config:
         from_attributes = True
 
 
+class ScoreBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class QuizStatisticsResponse(BaseModel):
+    quiz_id: UUID
+    count: int
+    mean: Optional[float] = None
+    variance: Optional[float] = None
+    std_dev: Optional[float] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    histogram: List[ScoreBin]
+
+
 class QuestionOptionCreate(BaseModel):
     id: Optional[UUID] = None
     content: str
@@ -54,6 +75,34 @@ class QuestionCreate(BaseModel):
     options: List[QuestionOptionCreate]
 
 
+class BundleOption(BaseModel):
+    id: UUID
+    content: str
+
+
+class BundleQuestion(BaseModel):
+    id: UUID
+    content: str
+    type: str
+    points: int
+    options: List[BundleOption]
+
+
+class QuizBundleResponse(BaseModel):
+    """Quiz + câu hỏi + options cho học sinh (không có is_correct)."""
+    id: UUID
+    title: str
+    description: Optional[str] = None
+    course_id: UUID
+    time_limit: Optional[int] = None
+    max_attempts: Optional[int] = None
+    total_points: Optional[int] = None
+    is_published: bool
+    questions: List[BundleQuestion]
+    # Chỉ có với quiz đã publish (phục vụ từ snapshot)
+    snapshot_version: Optional[int] = None
+
+
 class QuestionResponse(QuestionCreate):
     id: UUID
     options: List[QuestionOptionCreate]
@@ -0,0 +1,122 @@
+"""
+Benchmark of adding questions to a quiz with 10/100/1000-question payloads.
+
+Compares the former per-question flush loop with the bulk path of
+`repositories.quiz.bulk_insert_questions` (multi-row INSERT, and COPY on
+PostgreSQL). Runs against DATABASE_URL; every run is rolled back.
+
+Usage:
+    python -m app.scripts.bench_add_questions [--sizes 10 100 1000]
+"""
+import argparse
+import time
+import uuid
+
+from app.constants.enums.roles import RoleEnum
+from app.database.session import SessionLocal
+from app.models.models import (
+    AppUser, Course, CourseQuiz, QuestionOption, QuizQuestion)
+from app.repositories import quiz as quiz_repository
+
+
+def make_questions(n: int) -> list[dict]:
+    return [
+        {
+            "content": f"Câu hỏi số {i}",
+            "type": "SINGLE_CHOICE",
+            "points": 1,
+            "options": [
+                {"content": f"Đáp án {j}", "is_correct": j == 0}
+                for j in range(4)
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_add_questions(db, quiz_id, questions: list[dict]) -> None:
+    """The previous implementation: one flush per question."""
+    for q in questions:
+        question = QuizQuestion(
+            id=uuid.uuid4(),
+            quiz_id=quiz_id,
+            content=q["content"],
+            type=q["type"],
+            points=q["points"],
+        )
+        db.add(question)
+        db.flush()
+        for opt in q["options"]:
+            db.add(
+                QuestionOption(
+                    id=uuid.uuid4(),
+                    question_id=question.id,
+                    content=opt["content"],
+                    is_correct=opt["is_correct"],
+                )
+            )
+    db.flush()
+
+
+def bulk_add_questions(mode: str):
+    def run(db, quiz_id, questions: list[dict]) -> None:
+        quiz_repository.QUESTION_BULK_MODE = mode
+        quiz_repository.bulk_insert_questions(db, quiz_id, questions)
+    return run
+
+
+def make_quiz(db) -> uuid.UUID:
+    suffix = uuid.uuid4().hex[:12]
+    teacher = AppUser(
+        full_name="bench", email=f"bench-{suffix}@example.com",
+        password="x", role=RoleEnum.TEACHER,
+    )
+    db.add(teacher)
+    db.flush()
+    course = Course(name="bench", code=f"B{suffix}", teacher_id=teacher.id)
+    db.add(course)
+    db.flush()
+    quiz = CourseQuiz(title="bench", course_id=course.id,
+                      teacher_id=teacher.id)
+    db.add(quiz)
+    db.flush()
+    return quiz.id
+
+
+def bench(method, n: int, repeat: int) -> float:
+    questions = make_questions(n)
+    timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            quiz_id = make_quiz(db)
+            start = time.perf_counter()
+            method(db, quiz_id, questions)
+            timings.append(time.perf_counter() - start)
+        finally:
+            db.rollback()
+            db.close()
+    return min(timings) * 1000
+
+
+def main(sizes: list[int], repeat: int) -> None:
+    methods = {"legacy": legacy_add_questions,
+               "insert": bulk_add_questions("insert")}
+    db = SessionLocal()
+    if db.get_bind().dialect.name == "postgresql":
+        methods["copy"] = bulk_add_questions("copy")
+    db.close()
+
+    print(f"{'questions':>10}" + "".join(f"{m + ' ms':>12}" for m in methods))
+    for n in sizes:
+        row = [bench(method, n, repeat) for method in methods.values()]
+        print(f"{n:>10}" + "".join(f"{ms:>12.1f}" for ms in row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
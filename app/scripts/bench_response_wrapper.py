@@ -0,0 +1,131 @@
+"""
+Micro-benchmark of the response envelope on large question lists.
+
+Compares the former BaseHTTPMiddleware wrapper (decode the route's JSON,
+rebuild `AppResponseModel`, encode again) with the pure ASGI
+`ResponseWrapperMiddleware`, which splices the encoded body into the
+envelope.
+
+Usage:
+    python -m app.scripts.bench_response_wrapper [--sizes 100 1000 5000]
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.common.response import AppResponseModel, BusinessJsonResponse
+from app.constants.business_code import BusinessCode
+from app.middlewares.response_wrapper import ResponseWrapperMiddleware
+from app.schemas.quiz import QuestionOptionCreate, QuestionResponse
+
+
+class LegacyResponseWrapperMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here only as a baseline."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        data = json.loads(body.decode()) if body else None
+        wrapped = AppResponseModel(
+            business_code=BusinessCode.SUCCESS["code"],
+            status_code=response.status_code,
+            message=BusinessCode.SUCCESS["message"],
+            data=data,
+        ).model_dump()
+        return BusinessJsonResponse(
+            business_code=wrapped["business_code"],
+            content=wrapped,
+            status_code=response.status_code,
+        )
+
+
+def make_questions(n: int) -> list:
+    return jsonable_encoder([
+        QuestionResponse(
+            id=uuid.uuid4(),
+            content=f"Câu hỏi số {i}: nội dung tương đối dài " * 3,
+            type="single_choice",
+            points=1,
+            options=[
+                QuestionOptionCreate(
+                    id=uuid.uuid4(),
+                    content=f"Đáp án {j}",
+                    is_correct=j == 0,
+                )
+                for j in range(4)
+            ],
+        )
+        for i in range(n)
+    ])
+
+
+def make_app(payload: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/questions")
+    def questions():
+        return JSONResponse(payload)
+
+    return app
+
+
+async def call(app, path: str = "/questions") -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path":
+        path.encode(), "root_path": "", "query_string": b"", "headers": [],
+        "client": ("bench", 0), "server": ("bench", 80),
+    }
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(chunks)
+
+
+async def bench(app, repeat: int) -> float:
+    await call(app)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await call(app)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+async def main(sizes: list[int], repeat: int) -> None:
+    print(f"{'questions':>10} {'legacy ms':>10} {'asgi ms':>10} {'speedup':>8}")
+    for n in sizes:
+        payload = {"items": make_questions(n), "total": n, "page": 1}
+        legacy = LegacyResponseWrapperMiddleware(make_app(payload))
+        current = ResponseWrapperMiddleware(make_app(payload))
+
+        # Hai cách phải cho ra cùng một body
+        assert await call(legacy) == await call(current)
+
+        legacy_ms = await bench(legacy, repeat)
+        current_ms = await bench(current, repeat)
+        print(
+            f"{n:>10} {legacy_ms:>10.2f} {current_ms:>10.2f} "
+            f"{legacy_ms / current_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeat))
@@ -0,0 +1,226 @@
+"""
+Check that PostgreSQL plans the hot queries with their indexes.
+
+Each check calls the service function an endpoint runs, with the
+arguments the endpoint passes: list endpoints are checked both on their
+first page (ORDER BY + `count(*) OVER ()`) and on a keyset page reached
+with a cursor. The emitted SQL is captured and EXPLAINed; a check fails
+when none of its statements' plans touch one of the expected indexes.
+Services that commit are not called: their read queries are checked
+through the repository function they use. Sequential scans are
+disabled for the transaction by default, so the check also works on a
+small development database where the planner would rightly prefer a
+seq scan; pass --real-costs to keep the planner's own choice on
+production-sized data. Everything is rolled back.
+
+Usage:
+    python -m app.scripts.check_query_plans [--real-costs]
+"""
+import argparse
+import sys
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from sqlalchemy import event, text
+
+from app.common.cache import answer_key_cache
+from app.common.exceptions import BusinessException
+from app.common.pagination import PaginationRequest, encode_cursor
+from app.database.session import SessionLocal, engine
+from app.models.models import (
+    AppUser, CourseEnrollment, QuizAttempt, QuizQuestion)
+from app.repositories import course as course_repo
+from app.services import attempt as attempt_service
+from app.services import auth as auth_service
+from app.services import course as course_service
+from app.services import grading
+from app.services import quiz as quiz_service
+from app.services import user as user_service
+
+PAGE_SIZE = 10
+
+
+def _paged(name, index, cursor, call) -> list[tuple]:
+    """
+    Hai check cho một endpoint danh sách: trang đầu (page mode) và một
+    trang keyset với cursor lấy từ `ids.<cursor>`.
+    """
+    return [
+        (f"{name} (page)", index, lambda db, ids: call(db, ids, None)),
+        (f"{name} (cursor)", index,
+         lambda db, ids: call(db, ids, getattr(ids, cursor))),
+    ]
+
+
+def _load_answer_key(db, ids):
+    # Bỏ qua cache để query đáp án thật sự chạy
+    answer_key_cache.invalidate(ids.question_quiz_id)
+    grading.load_answer_key(db, ids.question_quiz_id)
+
+
+# (tên check, index mong đợi, hàm phát sinh query)
+CHECKS = [
+    # GET /attempts/?user_id= | ?quiz_id=
+    *_paged(
+        "attempt.list_attempts(user_id)",
+        "ix_quiz_attempts_user_id_started_at_id", "time_cursor",
+        lambda db, ids, cursor: attempt_service.list_attempts(
+            ids.user_id, None, db, 1, PAGE_SIZE, cursor)),
+    *_paged(
+        "attempt.list_attempts(quiz_id)",
+        "ix_quiz_attempts_quiz_id_started_at_id", "time_cursor",
+        lambda db, ids, cursor: attempt_service.list_attempts(
+            None, ids.quiz_id, db, 1, PAGE_SIZE, cursor)),
+    # GET /attempts/by_quiz/{quiz_id}: trang user_id rồi attempts của trang
+    *_paged(
+        "attempt.get_attempts_grouped_by_user_paginated",
+        "ix_quiz_attempts_quiz_id_user_id", "user_cursor",
+        lambda db, ids, cursor:
+            attempt_service.get_attempts_grouped_by_user_paginated(
+                db, ids.quiz_id, PaginationRequest(
+                    page=1, page_size=PAGE_SIZE, cursor=cursor))),
+    # GET /attempts/{attempt_id}: attempt JOIN answers
+    ("attempt.get_attempt", "ix_quiz_attempt_answers_attempt_id",
+     lambda db, ids: attempt_service.get_attempt(ids.attempt_id, db)),
+    # POST /attempts/{attempt_id}/submit: nạp đáp án khi cache trống
+    ("grading.load_answer_key questions",
+     "ix_quiz_questions_quiz_id_position_id", _load_answer_key),
+    ("grading.load_answer_key options",
+     "ix_question_options_question_id", _load_answer_key),
+    # GET /quizzes/{quiz_id}/questions: trang câu hỏi + options (IN)
+    *_paged(
+        "quiz.get_questions_by_quiz",
+        "ix_quiz_questions_quiz_id_position_id", "question_cursor",
+        lambda db, ids, cursor: quiz_service.get_questions_by_quiz(
+            db, ids.question_quiz_id, 1, PAGE_SIZE, cursor)),
+    # Query IN của selectinload chỉ chạy khi trang có câu hỏi
+    ("quiz.get_questions_by_quiz options",
+     "ix_question_options_question_id",
+     lambda db, ids: quiz_service.get_questions_by_quiz(
+         db, ids.question_quiz_id, 1, PAGE_SIZE)),
+    # GET /quizzes/course/{course_id}
+    *_paged(
+        "quiz.list_quizzes",
+        "ix_course_quizzes_course_id_created_at_id", "time_cursor",
+        lambda db, ids, cursor: quiz_service.list_quizzes(
+            db, ids.course_id, ids.user_id, 1, PAGE_SIZE, cursor)),
+    # GET /courses/ và /courses/enrolled
+    *_paged(
+        "course.list_courses", "ix_courses_created_at_id", "time_cursor",
+        lambda db, ids, cursor: course_service.list_courses(
+            db, 1, PAGE_SIZE, cursor)),
+    *_paged(
+        "course.list_enrolled_courses", "ix_course_enrollments_user_id",
+        "time_cursor",
+        lambda db, ids, cursor: course_service.list_enrolled_courses(
+            db, 1, PAGE_SIZE, ids.user_id, cursor)),
+    # GET /users/ và /users/course/{course_id}
+    *_paged(
+        "user.get_all_users_service", "ix_app_users_created_at_id",
+        "time_cursor",
+        lambda db, ids, cursor: user_service.get_all_users_service(
+            db, 1, PAGE_SIZE, cursor)),
+    *_paged(
+        "user.get_all_users_in_course",
+        "ix_course_enrollments_course_id_user_id", "time_cursor",
+        lambda db, ids, cursor: user_service.get_all_users_in_course(
+            db, ids.course_id, 1, PAGE_SIZE, cursor)),
+    # join_course_service / kick_student_from_course commit → chỉ check
+    # query đọc mà chúng dùng
+    ("course.get_enrollment", "ix_course_enrollments_course_id_user_id",
+     lambda db, ids: course_repo.get_enrollment(
+         db, ids.course_id, ids.user_id)),
+    ("auth.login_service", "ix_app_users_full_name",
+     lambda db, ids: auth_service.login_service(db, ids.full_name, "")),
+]
+
+
+def sample_ids(db) -> SimpleNamespace:
+    """
+    Lấy id thật trong DB (nếu có) để plan sát với dữ liệu thật, và các
+    cursor trỏ vào giữa danh sách (trước mọi dòng hiện có).
+    """
+    attempt = db.query(QuizAttempt).first()
+    enrollment = db.query(CourseEnrollment).first()
+    question = db.query(QuizQuestion).first()
+    user = db.query(AppUser).first()
+    max_id = uuid.UUID(int=(1 << 128) - 1)
+    return SimpleNamespace(
+        user_id=attempt.user_id if attempt else uuid.uuid4(),
+        quiz_id=attempt.quiz_id if attempt else uuid.uuid4(),
+        attempt_id=attempt.id if attempt else uuid.uuid4(),
+        question_quiz_id=question.quiz_id if question else uuid.uuid4(),
+        course_id=enrollment.course_id if enrollment else uuid.uuid4(),
+        full_name=user.full_name if user else "nobody",
+        # Danh sách sắp giảm dần theo (created_at|started_at, id)
+        time_cursor=encode_cursor([datetime.utcnow(), max_id]),
+        # Câu hỏi sắp tăng dần theo (position, id)
+        question_cursor=encode_cursor([0, uuid.UUID(int=0)]),
+        # User đã làm quiz sắp tăng dần theo user_id
+        user_cursor=encode_cursor([uuid.UUID(int=0)]),
+    )
+
+
+def index_names(plan: dict) -> set[str]:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= index_names(child)
+    return names
+
+
+def capture(db, func, ids) -> list[tuple]:
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        func(db, ids)
+    except (HTTPException, BusinessException):
+        # Chỉ cần SQL đã chạy (vd: 404 khi id mẫu không có trong DB)
+        pass
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    # Bỏ EXPLAIN do chính service chạy (total_mode="estimated")
+    return [(statement, parameters) for statement, parameters in statements
+            if not statement.lstrip().upper().startswith("EXPLAIN")]
+
+
+def main(real_costs: bool) -> int:
+    if engine.dialect.name != "postgresql":
+        print(f"PostgreSQL required, got {engine.dialect.name}")
+        return 2
+
+    db = SessionLocal()
+    failures = 0
+    try:
+        ids = sample_ids(db)
+        if not real_costs:
+            db.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, index, func in CHECKS:
+            used = set()
+            for statement, parameters in capture(db, func, ids):
+                plan = db.connection().exec_driver_sql(
+                    "EXPLAIN (FORMAT JSON) " + statement, parameters
+                ).scalar()
+                used |= index_names(plan[0]["Plan"])
+            expected = (index,) if isinstance(index, str) else index
+            ok = bool(used.intersection(expected))
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name}: {' | '.join(expected)}"
+                  + ("" if ok else f" (plan uses {sorted(used) or 'no index'})"))
+    finally:
+        db.rollback()
+        db.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--real-costs", action="store_true",
+                        help="Keep sequential scans enabled")
+    args = parser.parse_args()
+    sys.exit(main(args.real_costs))
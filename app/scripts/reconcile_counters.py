@@ -0,0 +1,48 @@
+"""
+Repair drift in the counter columns of courses and course_quizzes.
+
+Recomputes every counter from the child tables and rewrites only the rows
+whose stored value differs. Quiz score statistics are rebuilt from the
+submitted attempts (they are append-only, so deleted attempts cause drift).
+
+Usage:
+    python -m app.scripts.reconcile_counters [--dry-run]
+"""
+import argparse
+
+from app.database.session import SessionLocal
+from app.models.models import CourseQuiz
+from app.repositories import attempt as attempt_repo
+from app.repositories.counters import reconcile_statements
+from app.services import statistics
+
+
+def main(dry_run: bool) -> None:
+    db = SessionLocal()
+    try:
+        for name, statement in reconcile_statements():
+            result = db.execute(statement)
+            print(f"{name}: {result.rowcount} row(s) fixed")
+        rebuilt = 0
+        for (quiz_id,) in db.query(CourseQuiz.id):
+            stats = attempt_repo.lock_score_stats(db, quiz_id)
+            before = (stats.count, stats.histogram)
+            statistics.rebuild(
+                stats, attempt_repo.get_finished_scores(db, quiz_id))
+            rebuilt += before != (stats.count, stats.histogram)
+        print(f"quiz_score_stats: {rebuilt} row(s) fixed")
+        if dry_run:
+            db.rollback()
+            print("dry run: rolled back")
+        else:
+            db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report drift without writing")
+    args = parser.parse_args()
+    main(args.dry_run)
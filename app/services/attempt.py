@@ -3,17 +3,18 @@ from uuid import UUID
 from datetime import datetime
 from fastapi import HTTPException
 
-from app.models.models import QuizAttempt, QuizAttemptAnswer, QuizQuestion
+from app.models.models import QuizAttempt
 from app.schemas.attempt import (
     QuizAttemptCreate,
     QuizAttemptAnswerCreate,
     QuizAttemptByUser,
     QuizAttemptItem,
 )
+from app.core.config import LARGE_TABLE_TOTAL_MODE
 from app.repositories import attempt as repo
-from collections import defaultdict
-from math import ceil
-from app.common.pagination import PaginationResponse, PaginationRequest
+from app.services import grading, statistics
+from app.common.pagination import (
+    PaginationResponse, PaginationRequest, paginate)
 
 
 def start_attempt(payload: QuizAttemptCreate, db: Session) -> QuizAttempt:
@@ -21,14 +22,20 @@ def start_attempt(payload: QuizAttemptCreate, db: Session) -> QuizAttempt:
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
-    prev_attempts = repo.count_user_attempts(
-        db, payload.user_id, payload.quiz_id
+    # ✅ Cấp số lần làm bài và kiểm tra max_attempts trong một lệnh atomic
+    attempt_number = repo.allocate_attempt_number(
+        db, payload.user_id, payload.quiz_id, quiz.max_attempts
     )
+    if attempt_number is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=400, detail="Maximum number of attempts reached"
+        )
 
     attempt = QuizAttempt(
         user_id=payload.user_id,
         quiz_id=payload.quiz_id,
-        attempt_number=prev_attempts + 1,
+        attempt_number=attempt_number,
         started_at=datetime.utcnow(),
     )
     return repo.create_attempt(db, attempt)
@@ -48,92 +55,67 @@ def submit_attempt(
             status_code=400, detail="Attempt already submitted"
         )
 
-    # ✅ Lấy danh sách câu hỏi của quiz
-    all_questions = (
-        db.query(QuizQuestion)
-        .filter(QuizQuestion.quiz_id == attempt.quiz_id)
-        .all()
-    )
-    total_questions = len(all_questions)
-
-    correct_count = 0
-
-    # ✅ Chấm điểm từng câu
-    for ans in answers:
-        question = repo.get_question(db, ans.question_id)
-        if not question:
-            continue
-
-        option = repo.get_option(db, ans.option_id) if ans.option_id else None
-        is_correct = option.is_correct if option else False
+    # ✅ Nạp đáp án của quiz bằng một query, chấm toàn bộ trong bộ nhớ
+    key = grading.load_answer_key(db, attempt.quiz_id)
+    total_questions = key.total_questions
+    rows, correct_count = grading.grade_answers(key, attempt.id, answers)
 
-        if is_correct:
-            correct_count += 1
+    # ✅ Tính điểm theo thang 10, làm tròn 1 chữ số thập phân
+    score = grading.compute_score(correct_count, total_questions)
 
-        attempt_answer = QuizAttemptAnswer(
-            attempt_id=attempt.id,
-            question_id=ans.question_id,
-            option_id=ans.option_id,
-            is_correct=is_correct,
-            score=1 if is_correct else 0,
+    # ✅ Nhận bài atomic (WHERE finished_at IS NULL) trước mọi lệnh ghi khác:
+    # nộp trùng đồng thời không ghi trùng answers / thống kê
+    if not repo.finish_attempt(db, attempt, score, datetime.utcnow()):
+        db.rollback()
+        raise HTTPException(
+            status_code=400, detail="Attempt already submitted"
         )
-        repo.save_answer(db, attempt_answer)
 
-    # ✅ Tính điểm theo thang 10
-    score = (correct_count / total_questions) * 10
+    # ✅ Ghi tất cả câu trả lời bằng một lệnh bulk insert
+    repo.bulk_save_answers(db, rows)
 
-    # ✅ Làm tròn 1 chữ số thập phân (tuỳ bạn)
-    score = round(score, 1)
+    repo.record_attempt_result(db, attempt)
 
-    attempt.score = score
-    attempt.finished_at = datetime.utcnow()
+    # ✅ Cập nhật thống kê điểm của quiz (O(1), một lệnh upsert). Lệnh ghi
+    # cuối cùng trước commit: dòng thống kê chung của quiz bị khoá ngắn nhất
+    repo.record_score(
+        db, attempt.quiz_id, score,
+        statistics.bin_of(score), statistics.HISTOGRAM_BINS)
 
+    # ✅ Dựng response từ dữ liệu trong bộ nhớ trước khi commit
+    # (commit expire attempt; không refresh / lazy load answers)
+    result = _attempt_detail(
+        attempt, score, correct_count, total_questions, rows)
     repo.commit(db)
-    db.refresh(attempt)
-
-    # ✅ Trả về đầy đủ dữ liệu
-    return {
-        "id": attempt.id,
-        "quiz_id": attempt.quiz_id,
-        "user_id": attempt.user_id,
-        "attempt_number": attempt.attempt_number,
-        "score": attempt.score,
-        "correct_count": correct_count,
-        "total_questions": total_questions,
-        "started_at": attempt.started_at,
-        "finished_at": attempt.finished_at,
-        "answers": attempt.answers,
-    }
+    return result
 
 
 def get_attempt(attempt_id: UUID, db: Session) -> dict:
-    attempt = repo.get_attempt(db, attempt_id)
-    if not attempt:
+    # ✅ Attempt, answers và số câu hỏi của quiz trong một query
+    detail = repo.get_attempt_detail(db, attempt_id)
+    if not detail:
         raise HTTPException(status_code=404, detail="Attempt not found")
+    attempt, total_questions = detail
 
-    # ✅ Lấy danh sách câu hỏi thuộc quiz
-    all_questions = (
-        db.query(QuizQuestion)
-        .filter(QuizQuestion.quiz_id == attempt.quiz_id)
-        .all()
-    )
-    total_questions = len(all_questions)
-
-    # ✅ Đếm số câu đúng
-    correct_count = (
-        db.query(QuizAttemptAnswer)
-        .filter(
-            QuizAttemptAnswer.attempt_id == attempt_id,
-            QuizAttemptAnswer.is_correct.is_(True)
-        )
-        .count()
-    )
+    answers = attempt.answers
+    correct_count = sum(1 for answer in answers if answer.is_correct)
 
     # ✅ Điểm (nếu attempt.score chưa tính)
     score = attempt.score
     if score is None:
-        score = round((correct_count / total_questions) * 10, 1)
+        score = grading.compute_score(correct_count, total_questions)
+
+    return _attempt_detail(
+        attempt, score, correct_count, total_questions, answers)
+
 
+def _attempt_detail(
+    attempt: QuizAttempt,
+    score: float,
+    correct_count: int,
+    total_questions: int,
+    answers: list,
+) -> dict:
     return {
         "id": attempt.id,
         "quiz_id": attempt.quiz_id,
@@ -144,7 +126,7 @@ def get_attempt(attempt_id: UUID, db: Session) -> dict:
         "total_questions": total_questions,
         "started_at": attempt.started_at,
         "finished_at": attempt.finished_at,
-        "answers": attempt.answers,
+        "answers": answers,
     }
 
 
@@ -153,52 +135,54 @@ def list_attempts(
     quiz_id: UUID | None,
     db: Session,
     page: int = 1,
-    page_size: int = 10
+    page_size: int = 10,
+    cursor: str | None = None,
 ):
     query = repo.list_attempts(db, user_id, quiz_id)
-    total_items = query.count()
-    total_page = (total_items + page_size - 1) // page_size
-    offset = (page - 1) * page_size
-    items = query.offset(offset).limit(page_size).all()
-
-    return {
-        "page": page,
-        "page_size": page_size,
-        "total_page": total_page,
-        "total_items": total_items,
-        "next": page + 1 if page < total_page else None,
-        "data": items
-    }
+    # Mới nhất trước; id làm khoá phụ để thứ tự ổn định
+    return paginate(
+        query,
+        [QuizAttempt.started_at, QuizAttempt.id],
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        descending=True,
+        total_mode=LARGE_TABLE_TOTAL_MODE,
+    )
 
 
 def get_attempts_grouped_by_user_paginated(
     db: Session,
-    quiz_id: str,
+    quiz_id: UUID,
     pagination: PaginationRequest
 ) -> PaginationResponse[QuizAttemptByUser]:
-    attempts = repo.get_attempts_by_quiz(db, quiz_id)
+    # 1. Phân trang danh sách user (không trùng) ngay trong SQL
+    result = paginate(
+        repo.get_quiz_user_ids(db, quiz_id),
+        [QuizAttempt.user_id],
+        page=pagination.page,
+        page_size=pagination.page_size,
+        cursor=pagination.cursor,
+    )
+    user_ids = [row.user_id for row in result["data"]]
 
-    # Group theo user
-    grouped = defaultdict(list)
+    # 2. ✅ Chỉ lấy attempts + tên của các user trong trang, 1 query
+    grouped = {user_id: [] for user_id in user_ids}
     user_names = {}
-    for attempt in attempts:
-        finished_at = (
-            attempt.finished_at.isoformat() if attempt.finished_at else None
-        )
-        grouped[attempt.user_id].append(
+    for row in repo.get_attempts_of_users(db, quiz_id, user_ids):
+        finished_at = row.finished_at.isoformat() if row.finished_at else None
+        grouped[row.user_id].append(
             QuizAttemptItem(
-                attempt_id=str(attempt.id),
-                attempt_number=attempt.attempt_number,
-                score=attempt.score,
-                started_at=attempt.started_at.isoformat(),
+                attempt_id=str(row.id),
+                attempt_number=row.attempt_number,
+                score=row.score,
+                started_at=row.started_at.isoformat(),
                 finished_at=finished_at,
             )
         )
-        user_names[attempt.user_id] = (
-            attempt.user.full_name if attempt.user else "Unknown"
-        )
+        user_names[row.user_id] = row.full_name or "Unknown"
 
-    all_users = [
+    result["data"] = [
         QuizAttemptByUser(
             user_id=str(user_id),
             user_name=user_names[user_id],
@@ -206,20 +190,4 @@ def get_attempts_grouped_by_user_paginated(
         )
         for user_id, attempt_list in grouped.items()
     ]
-
-    # Pagination
-    total_items = len(all_users)
-    total_page = ceil(total_items / pagination.page_size)
-    start = (pagination.page - 1) * pagination.page_size
-    end = start + pagination.page_size
-    data = all_users[start:end]
-    next_page = pagination.page + 1 if pagination.page < total_page else None
-
-    return PaginationResponse(
-        page=pagination.page,
-        page_size=pagination.page_size,
-        total_items=total_items,
-        total_page=total_page,
-        next=next_page,
-        data=data
-    )
+    return PaginationResponse(**result)
@@ -7,86 +7,89 @@ from app.repositories import course as repo
 from uuid import UUID
 from fastapi import HTTPException
 from datetime import datetime
-from app.models.models import CourseEnrollment
+from app.models.models import Course, CourseEnrollment
 from app.schemas.course import CourseOut
+from app.common.pagination import paginate
+from app.services import quiz_snapshot
+from app.common.etag import make_etag
 
 
-def list_courses(db: Session, page: int = 1, page_size: int = 10):
+def list_courses(
+    db: Session,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: str | None = None,
+):
     query = repo.get_courses(db)
-    total_items = query.count()
-    total_page = (total_items + page_size - 1) // page_size
-    offset = (page - 1) * page_size
-    courses = query.offset(offset).limit(page_size).all()
+    result = paginate(
+        query,
+        [Course.created_at, Course.id],
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        descending=True,
+    )
 
     # Chuyển sang CourseOut có thêm member_count & quiz_count
-    course_list = []
-    for c in courses:
-        course_list.append(
-            CourseOut(
-                id=c.id,
-                name=c.name,
-                code=c.code,
-                teacher_id=c.teacher_id,
-                created_at=c.created_at,
-                member_count=len(
-                    c.enrollments) if hasattr(c, "enrollments") else 0,
-                quiz_count=len(c.quizzes) if hasattr(c, "quizzes") else 0,
-            )
-        )
-
-    return {
-        "page": page,
-        "page_size": page_size,
-        "total_page": total_page,
-        "total_items": total_items,
-        "next": page + 1 if page < total_page else None,
-        "data": course_list,
-    }
+    result["data"] = [_to_course_out(c) for c in result["data"]]
+    return result
 
 
 def list_enrolled_courses(
-        db: Session, page: int = 1, page_size: int = 10, user_id: UUID = None):
+    db: Session,
+    page: int = 1,
+    page_size: int = 10,
+    user_id: UUID = None,
+    cursor: str | None = None,
+):
 
     if not user_id:
         raise ValueError("User ID is required for enrolled courses")
-    
+
     # Lấy query courses mà user đã enroll
     query = repo.get_enrolled_courses(db, user_id)
-    total_items = query.count()
-    total_page = (total_items + page_size - 1) // page_size
-    offset = (page - 1) * page_size
-    courses = query.offset(offset).limit(page_size).all()
+    result = paginate(
+        query,
+        [Course.created_at, Course.id],
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        descending=True,
+    )
 
     # Chuyển sang CourseOut có thêm member_count & quiz_count
-    course_list = []
-    for c in courses:
-        course_list.append(
-            CourseOut(
-                id=c.id,
-                name=c.name,
-                code=c.code,
-                teacher_id=c.teacher_id,
-                created_at=c.created_at,
-                member_count=len(c.enrollments) if hasattr(
-                    c, "enrollments") else 0,
-                quiz_count=len(c.quizzes) if hasattr(c, "quizzes") else 0,
-            )
-        )
+    result["data"] = [_to_course_out(c) for c in result["data"]]
+    return result
+
 
-    return {
-        "page": page,
-        "page_size": page_size,
-        "total_page": total_page,
-        "total_items": total_items,
-        "next": page + 1 if page < total_page else None,
-        "data": course_list,
-    }
+def _to_course_out(c) -> CourseOut:
+    # member_count & quiz_count là cột đếm trên bảng courses
+    return CourseOut(
+        id=c.id,
+        name=c.name,
+        code=c.code,
+        teacher_id=c.teacher_id,
+        created_at=c.created_at,
+        member_count=c.member_count,
+        quiz_count=c.quiz_count,
+    )
 
 
 def get_course(db: Session, course_id: UUID):
     return repo.get_course_by_id(db, course_id)
 
 
+def get_course_etag(db: Session, course_id: UUID) -> str | None:
+    """
+    ETag của course: version (tăng khi sửa) + member_count + quiz_count.
+    None nếu không có course.
+    """
+    row = repo.get_course_version(db, course_id)
+    if row is None:
+        return None
+    return make_etag("course", course_id, *row)
+
+
 def generate_course_code(length: int = 6) -> str:
     """Sinh mã khóa học ngẫu nhiên, ví dụ: COURSE-A1B2C3"""
     random_part = ''.join(random.choices(
@@ -158,7 +161,12 @@ def delete_course_service(db: Session, course_id: UUID):
     course = repo.get_course_by_id(db, course_id)
     if not course:
         return None
-    return repo.delete_course(db, course)
+    quiz_ids = repo.get_course_quiz_ids(db, course.id)
+    deleted = repo.delete_course(db, course)
+    # Quiz bị xoá theo course → bỏ snapshot của chúng
+    for quiz_id in quiz_ids:
+        quiz_snapshot.drop(quiz_id)
+    return deleted
 
 
 def kick_student_from_course(
@@ -0,0 +1,159 @@
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.common.cache import answer_key_cache
+from app.repositories import attempt as repo
+from app.schemas.attempt import QuizAttemptAnswerCreate
+
+
+class AnswerKey:
+    """
+    Đáp án của một quiz, được nạp bằng một query duy nhất.
+
+    `questions` map question_id -> (points, option_ids, correct_option_ids).
+    Đối tượng không thay đổi sau khi tạo nên có thể dùng chung qua cache.
+    """
+
+    __slots__ = ("quiz_id", "is_published", "questions")
+
+    def __init__(
+        self,
+        quiz_id: UUID,
+        is_published: bool,
+        questions: dict[UUID, tuple[int, frozenset, frozenset]],
+    ) -> None:
+        self.quiz_id = quiz_id
+        self.is_published = is_published
+        self.questions = questions
+
+    @property
+    def total_questions(self) -> int:
+        return len(self.questions)
+
+    @property
+    def total_points(self) -> int:
+        return sum(entry[0] for entry in self.questions.values())
+
+    @classmethod
+    def from_rows(cls, quiz_id: UUID, rows) -> "AnswerKey":
+        """
+        Build an answer key from the rows returned by
+        `repositories.attempt.get_answer_key_rows`.
+        """
+        is_published = False
+        points: dict[UUID, int] = {}
+        options: dict[UUID, set] = {}
+        correct: dict[UUID, set] = {}
+        for published, qid, qpoints, option_id, is_correct in rows:
+            is_published = bool(published)
+            if qid is None:
+                continue
+            points[qid] = qpoints
+            options.setdefault(qid, set())
+            correct.setdefault(qid, set())
+            if option_id is None:
+                continue
+            options[qid].add(option_id)
+            if is_correct:
+                correct[qid].add(option_id)
+
+        return cls(
+            quiz_id,
+            is_published,
+            {
+                qid: (points[qid], frozenset(options[qid]),
+                      frozenset(correct[qid]))
+                for qid in points
+            },
+        )
+
+
+def load_answer_key(db: Session, quiz_id: UUID) -> AnswerKey:
+    """
+    Lấy đáp án của quiz, ưu tiên cache.
+
+    Chỉ quiz đã publish mới được cache; cache bị xoá bởi
+    `repositories.quiz` mỗi khi quiz hoặc câu hỏi thay đổi.
+    """
+    key = answer_key_cache.get(quiz_id)
+    if key is not None:
+        return key
+
+    key = AnswerKey.from_rows(
+        quiz_id, repo.get_answer_key_rows(db, quiz_id)
+    )
+    if key.is_published:
+        answer_key_cache.set(quiz_id, key)
+    return key
+
+
+def grade_answers(
+    key: AnswerKey,
+    attempt_id: UUID,
+    answers: list[QuizAttemptAnswerCreate],
+) -> tuple[list[dict], int]:
+    """
+    Chấm toàn bộ danh sách câu trả lời trong bộ nhớ.
+
+    Raises:
+        HTTPException: 400 nếu một câu hỏi được trả lời nhiều lần hoặc
+        option không thuộc câu hỏi.
+
+    Returns:
+        tuple[list[dict], int]: Các row QuizAttemptAnswer sẵn sàng cho
+        bulk insert, và số câu trả lời đúng.
+    """
+    rows = []
+    correct_count = 0
+    answered = set()
+
+    for ans in answers:
+        # Mỗi câu hỏi chỉ được trả lời một lần: câu trùng sẽ làm số câu
+        # đúng vượt tổng số câu (điểm > 10) và ghi trùng answers
+        if ans.question_id in answered:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Duplicate answer for question {ans.question_id}",
+            )
+        answered.add(ans.question_id)
+
+        entry = key.questions.get(ans.question_id)
+        if entry is None:
+            # Câu hỏi không thuộc quiz → bỏ qua
+            continue
+
+        _, option_ids, correct_ids = entry
+        if ans.option_id is not None and ans.option_id not in option_ids:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"Option {ans.option_id} does not belong to "
+                    f"question {ans.question_id}"
+                ),
+            )
+
+        is_correct = ans.option_id in correct_ids
+        if is_correct:
+            correct_count += 1
+
+        rows.append(
+            {
+                "id": uuid4(),
+                "attempt_id": attempt_id,
+                "question_id": ans.question_id,
+                "option_id": ans.option_id,
+                "is_correct": is_correct,
+                "score": 1 if is_correct else 0,
+            }
+        )
+
+    return rows, correct_count
+
+
+def compute_score(correct_count: int, total_questions: int) -> float:
+    """Điểm theo thang 10, làm tròn 1 chữ số thập phân."""
+    if not total_questions:
+        return 0
+    return round((correct_count / total_questions) * 10, 1)
@@ -1,7 +1,9 @@
 from sqlalchemy.orm import Session
 from uuid import UUID
+from fastapi import HTTPException
 
 from app.repositories import quiz as quiz_repository
+from app.services import quiz_snapshot
 from app.schemas.quiz import (
     QuizCreate,
     QuizUpdate,
@@ -10,9 +12,10 @@ from app.schemas.quiz import (
     QuizResponse,
 )
 from typing import List
-from app.models.models import CourseQuiz, QuizAttempt
-from app.common.pagination import PaginationResponse
-from sqlalchemy import func
+from app.models.models import CourseQuiz, QuizQuestion
+from app.common.pagination import PaginationResponse, paginate
+from app.common.response import json_dumps
+from app.common.etag import make_etag
 
 
 def create_quiz(db: Session, quiz_in: QuizCreate, user_id: UUID) -> CourseQuiz:
@@ -23,115 +26,160 @@ def add_questions_to_quiz(
     db: Session, quiz_id: UUID, questions: List[QuestionCreate]
 ) -> List[QuestionResponse]:
     # Ở đây có thể thêm logic validate quiz tồn tại
-    return quiz_repository.add_questions_to_quiz(db, quiz_id, questions)
+    created = quiz_repository.add_questions_to_quiz(db, quiz_id, questions)
+    quiz_snapshot.refresh(db, quiz_id)
+    return created
+
+
+def import_questions(db: Session, quiz_id: UUID, questions: List[dict]) -> int:
+    """
+    Thêm toàn bộ câu hỏi đã parse (output của parser PDF) vào quiz rồi
+    commit ngay: question_count chỉ tăng một lần nên dòng quiz chỉ bị khoá
+    trong lúc insert, không phải trong lúc parse.
+    """
+    created = quiz_repository.bulk_insert_questions(db, quiz_id, questions)
+    quiz_repository.commit_questions(db, quiz_id)
+    quiz_snapshot.refresh(db, quiz_id)
+    return len(created)
 
 
 def get_quiz(db: Session, quiz_id: UUID) -> CourseQuiz:
     return quiz_repository.get_quiz(db, quiz_id)
 
 
+def get_quiz_etag(db: Session, quiz_id: UUID) -> str | None:
+    """
+    ETag của quiz: version (tăng khi sửa) + các bộ đếm hiển thị trong
+    QuizResponse. None nếu không có quiz.
+    """
+    row = quiz_repository.get_quiz_version(db, quiz_id)
+    if row is None:
+        return None
+    return make_etag("quiz", quiz_id, *row)
+
+
+def get_questions_etag(
+    db: Session, quiz_id: UUID, query_string: str
+) -> str | None:
+    """
+    ETag cho một trang câu hỏi: câu hỏi chỉ được thêm (question_count
+    tăng) nên version + question_count + tham số trang là đủ.
+    """
+    row = quiz_repository.get_quiz_version(db, quiz_id)
+    if row is None:
+        return None
+    version, question_count, _ = row
+    return make_etag("questions", quiz_id, version, question_count,
+                     query_string)
+
+
 def list_quizzes(
     db: Session,
     course_id: UUID,
     user_id: UUID,
     page: int = 1,
     page_size: int = 10,
+    cursor: str | None = None,
 ) -> PaginationResponse:
 
-    # 1. Subquery để ĐẾM SỐ LẦN THỬ của user cho mỗi quiz
-    attempt_count_subquery = (
-        db.query(func.count(QuizAttempt.id))
-        .filter(
-            QuizAttempt.quiz_id == CourseQuiz.id,  # Liên kết với quiz chính
-            QuizAttempt.user_id == user_id,        # Lọc theo user hiện tại
-        )
-        .scalar_subquery()
-    )
-
-    # 2. (Giữ nguyên) Subquery để lấy finished_at của lần thử gần nhất
-    latest_attempt_subquery = (
-        db.query(QuizAttempt.finished_at)
-        .filter(
-            QuizAttempt.quiz_id == CourseQuiz.id,
-            QuizAttempt.user_id == user_id,
-        )
-        .order_by(QuizAttempt.attempt_number.desc())
-        .limit(1)
-        .scalar_subquery()
-    )
-
-    # 3. Lấy query cơ bản từ repository
-    base_query = quiz_repository.list_quizzes(db, course_id)
+    # 1. ✅ Quiz + dòng user_quiz_status của user (join theo khoá chính),
+    # thay cho 2 subquery quét quiz_attempts trên mỗi quiz
+    query = quiz_repository.list_quizzes_with_status(db, course_id, user_id)
 
-    # 4. Thêm CẢ HAI cột từ subquery vào query chính
-    query_with_status = base_query.add_columns(
-        attempt_count_subquery.label("attempt_count"),
-        latest_attempt_subquery.label("latest_attempt_finished_at")
+    # 2. Phân trang theo (created_at, id): ổn định và dùng được index
+    result = paginate(
+        query,
+        [CourseQuiz.created_at, CourseQuiz.id],
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        descending=True,
+        row_entity=lambda row: row[0],
     )
 
-    # 5. Tính toán phân trang
-    total_items = query_with_status.count()
-    total_page = (total_items + page_size - 1) // page_size
-    offset = (page - 1) * page_size
-
-    # 6. Thực thi query với phân trang
-    items_with_status = query_with_status.offset(offset).limit(page_size).all()
-
-    # 7. Xử lý kết quả để tạo response
+    # 3. Xử lý kết quả để tạo response
     data = []
-    for quiz, attempt_count, finished_at in items_with_status:
+    for quiz, status in result["data"]:
         # Chuyển đổi object SQLAlchemy thành dict
         quiz_dict = quiz.__dict__.copy()
         if '_sa_instance_state' in quiz_dict:
             del quiz_dict['_sa_instance_state']
 
-        # Thêm thông tin từ subquery
-        quiz_dict["attempt_count"] = attempt_count or 0
-        quiz_dict["latest_attempt_finished_at"] = finished_at
-
-        # TÍNH TOÁN SỐ LẦN LÀM BÀI CÒN LẠI
-        max_attempts = quiz.max_attempts or 0
-        user_attempts = attempt_count or 0
-        remaining = max(0, max_attempts - user_attempts)
-        quiz_dict["remaining_attempts"] = remaining
+        # Thêm thông tin từ user_quiz_status (None: chưa làm lần nào)
+        attempt_count = status.attempt_count if status else 0
+        quiz_dict["attempt_count"] = attempt_count
+        quiz_dict["latest_attempt_finished_at"] = (
+            status.last_finished_at if status else None)
+        quiz_dict["best_score"] = status.best_score if status else None
+        quiz_dict["last_score"] = status.last_score if status else None
+
+        # Số lần làm còn lại (None: không giới hạn, như start_attempt)
+        if quiz.max_attempts and quiz.max_attempts > 0:
+            quiz_dict["remaining_attempts"] = max(
+                0, quiz.max_attempts - attempt_count)
+        else:
+            quiz_dict["remaining_attempts"] = None
 
         # Tạo Pydantic model từ dict
         data.append(QuizResponse(**quiz_dict))
 
-    return PaginationResponse(
-        page=page,
-        page_size=page_size,
-        total_page=total_page,
-        total_items=total_items,
-        next=page + 1 if page < total_page else None,
-        data=data,
-    )
+    result["data"] = data
+    return PaginationResponse(**result)
 
 
 def get_questions_by_quiz(
-    db: Session, quiz_id: UUID, page: int, page_size: int
+    db: Session,
+    quiz_id: UUID,
+    page: int,
+    page_size: int,
+    cursor: str | None = None,
 ) -> PaginationResponse[QuestionResponse]:
     query = quiz_repository.repo_get_questions(db, quiz_id)
-    total_items = query.count()
-    total_page = (total_items + page_size - 1) // page_size
-    offset = (page - 1) * page_size
-    items = query.offset(offset).limit(page_size).all()
-    return {
-        "page": page,
-        "page_size": page_size,
-        "total_page": total_page,
-        "total_items": total_items,
-        "next": page + 1 if page < total_page else None,
-        "data": items,
-    }
+    # Thứ tự giáo viên nhập; id để thứ tự toàn phần
+    return paginate(
+        query,
+        [QuizQuestion.position, QuizQuestion.id],
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+    )
+
+
+def get_quiz_bundle(db: Session, quiz_id: UUID, is_teacher: bool) -> bytes:
+    """
+    Bundle của quiz dạng bytes JSON. Quiz đã publish được phục vụ từ
+    snapshot (không query); snapshot chưa có thì build và lưu lại.
+    """
+    blob = quiz_snapshot.get(quiz_id)
+    if blob is not None:
+        return blob
+
+    # ✅ Quiz, câu hỏi và options trong số query cố định
+    quiz = quiz_repository.get_quiz_with_questions(db, quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    if not quiz.is_published:
+        if not is_teacher:
+            raise HTTPException(
+                status_code=403, detail="Quiz is not published")
+        return json_dumps(quiz_snapshot.build_bundle(quiz))
+    return quiz_snapshot.save(quiz_id, quiz_snapshot.build_bundle(quiz))
 
 
 def update_quiz(db: Session, quiz_id: UUID, quiz_in: QuizUpdate) -> CourseQuiz:
     quiz = get_quiz(db, quiz_id)
-    return quiz_repository.update_quiz(db, quiz, quiz_in)
+    if not quiz:
+        return None
+    was_published = quiz.is_published
+    quiz = quiz_repository.update_quiz(db, quiz, quiz_in)
+    # ✅ Publish / sửa quiz đã publish → build lại snapshot; bỏ publish → xoá
+    if was_published or quiz.is_published:
+        quiz_snapshot.refresh(db, quiz_id)
+    return quiz
 
 
 def delete_quiz(db: Session, quiz_id: UUID):
     quiz = get_quiz(db, quiz_id)
     quiz_repository.delete_quiz(db, quiz)
+    quiz_snapshot.drop(quiz_id)
     return {"message": "Quiz deleted successfully"}
@@ -0,0 +1,124 @@
+"""
+Snapshot của quiz đã publish: bundle (câu hỏi + options, không có đáp án
+đúng) được mã hoá JSON một lần và phục vụ nguyên bytes, không chạm ORM.
+
+Mỗi snapshot là một file `{quiz_id}.v{FORMAT_VERSION}.json` trên đĩa (dùng
+chung cho các worker trên cùng máy) và một bản trong bộ nhớ của worker.
+Bản trong bộ nhớ được đối chiếu với mtime của file mỗi lần đọc (một lần
+stat), nên snapshot do worker khác build lại cũng được nhận ngay.
+"""
+import os
+import time
+import uuid
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.common.cache import quiz_snapshot_cache
+from app.common.response import json_dumps
+from app.core.config import QUIZ_SNAPSHOT_DIR
+from app.models.models import CourseQuiz
+from app.repositories import quiz as quiz_repository
+
+# Tăng khi đổi cấu trúc bundle để không đọc nhầm file cũ
+# (2: câu hỏi sắp theo position)
+FORMAT_VERSION = 2
+
+os.makedirs(QUIZ_SNAPSHOT_DIR, exist_ok=True)
+
+
+def _path(quiz_id: UUID) -> str:
+    return os.path.join(
+        QUIZ_SNAPSHOT_DIR, f"{quiz_id}.v{FORMAT_VERSION}.json")
+
+
+def build_bundle(quiz: CourseQuiz) -> dict:
+    """
+    Quiz + câu hỏi + options dạng dict cho học sinh làm bài: bỏ is_correct,
+    câu hỏi sắp theo (position, id) như danh sách câu hỏi.
+    """
+    return {
+        "id": quiz.id,
+        "title": quiz.title,
+        "description": quiz.description,
+        "course_id": quiz.course_id,
+        "time_limit": quiz.time_limit,
+        "max_attempts": quiz.max_attempts,
+        "total_points": quiz.total_points,
+        "is_published": quiz.is_published,
+        "questions": [
+            {
+                "id": question.id,
+                "content": question.content,
+                "type": getattr(question.type, "value", question.type),
+                "points": question.points,
+                "options": [
+                    {"id": option.id, "content": option.content}
+                    for option in question.options
+                ],
+            }
+            for question in sorted(
+                quiz.questions, key=lambda q: (q.position, q.id))
+        ],
+    }
+
+
+def get(quiz_id: UUID) -> bytes | None:
+    """Bytes JSON của snapshot, hoặc None nếu quiz chưa có snapshot."""
+    path = _path(quiz_id)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        quiz_snapshot_cache.invalidate(quiz_id)
+        return None
+
+    cached = quiz_snapshot_cache.get(quiz_id)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+    except FileNotFoundError:
+        return None
+    quiz_snapshot_cache.set(quiz_id, (mtime, blob))
+    return blob
+
+
+def save(quiz_id: UUID, bundle: dict) -> bytes:
+    """
+    Mã hoá `bundle` (kèm snapshot_version) và ghi ra đĩa + bộ nhớ.
+    Ghi file tạm rồi os.replace để worker khác không đọc file dở dang.
+    """
+    blob = json_dumps({**bundle, "snapshot_version": time.time_ns()})
+    tmp_path = os.path.join(QUIZ_SNAPSHOT_DIR, f".{uuid.uuid4()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, _path(quiz_id))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    quiz_snapshot_cache.set(
+        quiz_id, (os.stat(_path(quiz_id)).st_mtime_ns, blob))
+    return blob
+
+
+def drop(quiz_id: UUID) -> None:
+    quiz_snapshot_cache.invalidate(quiz_id)
+    try:
+        os.remove(_path(quiz_id))
+    except FileNotFoundError:
+        pass
+
+
+def refresh(db: Session, quiz_id: UUID) -> None:
+    """
+    Build lại snapshot sau khi quiz hoặc câu hỏi thay đổi (đã commit):
+    quiz đã publish thì build mới, chưa publish / đã xoá thì bỏ snapshot.
+    """
+    quiz = quiz_repository.get_quiz(db, quiz_id)
+    if quiz is None or not quiz.is_published:
+        drop(quiz_id)
+        return
+    quiz = quiz_repository.get_quiz_with_questions(db, quiz_id)
+    save(quiz_id, build_bundle(quiz))
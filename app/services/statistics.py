@@ -0,0 +1,89 @@
+from datetime import datetime
+from math import sqrt
+from typing import Iterable
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.models.models import QuizScoreStats
+from app.repositories import quiz as quiz_repository
+
+# Thang điểm của compute_score và số khoảng (cố định) của histogram:
+# [0, 1), [1, 2), ..., [9, 10]. Đổi các giá trị này cần build lại
+# histogram đã lưu (scripts.reconcile_counters).
+SCORE_SCALE = 10
+HISTOGRAM_BINS = 10
+
+
+def bin_of(score: float) -> int:
+    """Ô histogram chứa `score`."""
+    index = int(score * HISTOGRAM_BINS // SCORE_SCALE)
+    return min(max(index, 0), HISTOGRAM_BINS - 1)
+
+
+def record_score(stats: QuizScoreStats, score: float) -> None:
+    """
+    Cộng một điểm vào thống kê (Welford: cập nhật mean và M2 trong O(1),
+    không cần đọc lại các điểm cũ). Khi nộp bài, phép tính tương tự chạy
+    trong DB (counters.record_score); hàm này dùng khi build lại.
+
+    Caller phải giữ khoá dòng `stats` (SELECT ... FOR UPDATE) tới khi commit.
+    """
+    count = stats.count + 1
+    delta = score - stats.mean
+    mean = stats.mean + delta / count
+    stats.m2 = stats.m2 + delta * (score - mean)
+    stats.mean = mean
+    stats.count = count
+
+    stats.min_score = score if stats.min_score is None else min(
+        stats.min_score, score)
+    stats.max_score = score if stats.max_score is None else max(
+        stats.max_score, score)
+
+    # ✅ Gán list mới: cột JSON không theo dõi thay đổi tại chỗ
+    histogram = list(stats.histogram or [0] * HISTOGRAM_BINS)
+    histogram[bin_of(score)] += 1
+    stats.histogram = histogram
+    stats.updated_at = datetime.utcnow()
+
+
+def rebuild(stats: QuizScoreStats, scores: Iterable[float]) -> None:
+    """Tính lại toàn bộ thống kê từ danh sách điểm."""
+    stats.count = 0
+    stats.mean = 0.0
+    stats.m2 = 0.0
+    stats.min_score = None
+    stats.max_score = None
+    stats.histogram = [0] * HISTOGRAM_BINS
+    for score in scores:
+        record_score(stats, score)
+
+
+def to_response(quiz_id: UUID, stats: QuizScoreStats | None) -> dict:
+    count = stats.count if stats else 0
+    histogram = (stats.histogram if stats else None) or [0] * HISTOGRAM_BINS
+    width = SCORE_SCALE / HISTOGRAM_BINS
+    # Phương sai tổng thể: thống kê trên toàn bộ bài đã nộp của quiz
+    variance = stats.m2 / count if count else None
+    return {
+        "quiz_id": quiz_id,
+        "count": count,
+        "mean": stats.mean if count else None,
+        "variance": variance,
+        "std_dev": sqrt(variance) if variance is not None else None,
+        "min_score": stats.min_score if count else None,
+        "max_score": stats.max_score if count else None,
+        "histogram": [
+            {"lower": i * width, "upper": (i + 1) * width, "count": n}
+            for i, n in enumerate(histogram)
+        ],
+    }
+
+
+def get_quiz_statistics(db: Session, quiz_id: UUID) -> dict:
+    stats = quiz_repository.get_score_stats(db, quiz_id)
+    if stats is None and not quiz_repository.get_quiz(db, quiz_id):
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return to_response(quiz_id, stats)
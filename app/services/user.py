@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session
-from math import ceil
 from uuid import UUID
 from app.models.models import AppUser
+from app.common.cache import principal_cache
+from app.common.pagination import paginate
 import app.repositories.user
 import app.schemas.user
 from passlib.context import CryptContext
@@ -9,44 +10,37 @@ from passlib.context import CryptContext
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def get_all_users_service(db: Session, page: int = 1, page_size: int = 10):
+def get_all_users_service(
+    db: Session,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: str | None = None,
+):
     query = app.repositories.user.get_all_users(db)
-    total_items = query.count()
-    total_page = (total_items + page_size - 1) // page_size
-    offset = (page - 1) * page_size
-    items = query.offset(offset).limit(page_size).all()
-
-    return {
-        "page": page,
-        "page_size": page_size,
-        "total_page": total_page,
-        "total_items": total_items,
-        "next": page + 1 if page < total_page else None,
-        "data": items
-    }
+    return paginate(
+        query,
+        [AppUser.created_at, AppUser.id],
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+    )
 
 
 def get_all_users_in_course(
     db: Session,
     course_id: str,
     page: int = 1,
-    page_size: int = 10
+    page_size: int = 10,
+    cursor: str | None = None,
 ):
     query = app.repositories.user.get_users_in_course(db, course_id)
-    total_items = query.count()
-    total_page = ceil(total_items / page_size)
-    offset = (page - 1) * page_size
-
-    users = query.offset(offset).limit(page_size).all()
-
-    return {
-        "page": page,
-        "page_size": page_size,
-        "total_page": total_page,
-        "total_items": total_items,
-        "next": page + 1 if page < total_page else None,
-        "data": users
-    }
+    return paginate(
+        query,
+        [AppUser.created_at, AppUser.id],
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+    )
 
 
 def get_user_by_id_service(db: Session, user_id: UUID):
@@ -79,11 +73,15 @@ def update_user_service(
     if "password" in updates:
         updates["password"] = pwd_context.hash(updates.pop("password"))
 
-    return app.repositories.user.update_user(db, db_user, updates)
+    user = app.repositories.user.update_user(db, db_user, updates)
+    principal_cache.invalidate_where(lambda u: u.id == user_id)
+    return user
 
 
 def delete_user_service(db: Session, user_id: UUID):
     db_user = app.repositories.user.get_user_by_id(db, user_id)
     if not db_user:
         return None
-    return app.repositories.user.delete_user(db, db_user)
+    user = app.repositories.user.delete_user(db, db_user)
+    principal_cache.invalidate_where(lambda u: u.id == user_id)
+    return user
@@ -0,0 +1,113 @@
+import json
+import os
+import uuid
+from typing import Dict, Iterator, List, Optional
+
+from app.common.response import json_dumps
+from app.core.config import PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES
+from app.utils.pdf_parser import PARSER_VERSION, iter_pdf_questions
+
+os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+
+
+def _path(digest: str) -> str:
+    return os.path.join(PDF_CACHE_DIR, f"{digest}.v{PARSER_VERSION}.ndjson")
+
+
+def get_cached_path(digest: str) -> Optional[str]:
+    """
+    Đường dẫn file NDJSON đã cache cho `digest` (sha256 của file PDF),
+    hoặc None nếu chưa có. Cập nhật mtime để eviction theo LRU.
+    """
+    path = _path(digest)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def load_questions(digest: str) -> Optional[List[Dict]]:
+    path = get_cached_path(digest)
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        # Vừa bị evict
+        return None
+
+
+def evict() -> None:
+    """
+    Xoá các file ít được dùng nhất cho tới khi tổng dung lượng cache
+    không vượt quá PDF_CACHE_MAX_BYTES.
+    """
+    entries = []
+    total = 0
+    with os.scandir(PDF_CACHE_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".ndjson"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+    for _, size, path in sorted(entries):
+        if total <= PDF_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def iter_and_cache(file_path: str, digest: str) -> Iterator[Dict]:
+    """
+    Parse PDF và ghi dần kết quả ra cache. File cache chỉ xuất hiện khi
+    parse thành công (ghi vào file tạm rồi os.replace).
+    """
+    if PDF_CACHE_MAX_BYTES <= 0:
+        yield from iter_pdf_questions(file_path)
+        return
+
+    tmp_path = os.path.join(PDF_CACHE_DIR, f".{uuid.uuid4()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            for question in iter_pdf_questions(file_path):
+                f.write(json_dumps(question) + b"\n")
+                yield question
+        os.replace(tmp_path, _path(digest))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    evict()
+
+
+def parse_and_cache(file_path: str, digest: str) -> List[Dict]:
+    return list(iter_and_cache(file_path, digest))
+
+
+def parse_and_cache_to_queue(
+    file_path: str, digest: str, queue, batch_size: int = 100
+) -> None:
+    """
+    Chạy trong process parse: đẩy câu hỏi vào `queue` theo từng lô (đồng
+    thời ghi cache), kết thúc bằng `None`.
+    """
+    batch = []
+    try:
+        for question in iter_and_cache(file_path, digest):
+            batch.append(question)
+            if len(batch) >= batch_size:
+                queue.put(batch)
+                batch = []
+        if batch:
+            queue.put(batch)
+    finally:
+        queue.put(None)
@@ -1,65 +1,95 @@
+import re
 import pdfplumber
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional
 from app.constants.enums.questionType import QuestionType
 
+# Tăng khi đổi logic parse → cache cũ tự hết hiệu lực
+PARSER_VERSION = 2
+
+# "Câu 1: Thủ đô của Việt Nam là?"
+QUESTION_RE = re.compile(r"^Câu (.*)$")
+# "Đáp án: B"
+ANSWER_RE = re.compile(r"^Đáp án")
+# "A. Hà Nội"
+OPTION_RE = re.compile(r"^(\S)\.(.+)$")
 
-def parse_pdf_to_questions(file_path: str) -> List[Dict]:
-    questions = []
-    text = ""
 
-    # Đọc toàn bộ text từ PDF
+def iter_pdf_lines(file_path: str) -> Iterator[str]:
+    """
+    Đọc text của PDF từng trang một, trả về từng dòng.
+    """
     with pdfplumber.open(file_path) as pdf:
         for page in pdf.pages:
             page_text = page.extract_text()
+            # Giải phóng layout của trang đã đọc
+            page.close()
             if page_text:
-                text += page_text + "\n"
-
-    # Tách các block theo "Câu"
-    blocks = text.split("Câu ")
-    for block in blocks[1:]:
-        lines = [
-            line.strip() for line in block.strip().split("\n") if line.strip()
-        ]
-        if not lines:
+                yield from page_text.split("\n")
+
+
+def _build_question(
+    content: str, options: List[Dict], correct_answer: Optional[str]
+) -> Dict:
+    return {
+        "content": content,
+        "type": QuestionType.SINGLE_CHOICE.value,
+        "points": 1,
+        "options": [
+            {"content": o["content"], "is_correct": o["label"] == correct_answer}
+            for o in options
+        ],
+    }
+
+
+def iter_questions(lines: Iterable[str]) -> Iterator[Dict]:
+    """
+    State machine trên từng dòng: một câu hỏi được yield ngay khi gặp
+    "Câu" tiếp theo (hoặc hết tài liệu), kể cả khi nó nằm trên hai trang.
+    """
+    content: Optional[str] = None
+    options: List[Dict] = []
+    correct_answer: Optional[str] = None
+
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+
+        match = QUESTION_RE.match(line)
+        if match:
+            if content is not None:
+                yield _build_question(content, options, correct_answer)
+            # Câu hỏi nằm sau dấu ":"
+            content = match.group(1).split(":", 1)[-1].strip()
+            options = []
+            correct_answer = None
+            continue
+
+        if content is None:
+            # Phần đầu tài liệu trước "Câu" đầu tiên
+            continue
+
+        if ANSWER_RE.match(line):
+            correct_answer = line.split(":")[-1].strip().upper()
             continue
 
-        # Câu hỏi nằm sau dấu ":"
-        question_content = lines[0].split(":", 1)[-1].strip()
-
-        options = []
-        correct_answer = None
-
-        for line in lines[1:]:
-            if line.startswith("Đáp án"):
-                correct_answer = line.split(":")[-1].strip().upper()
-            elif len(line) > 2 and line[1] == ".":
-                # Ví dụ: "A. Hà Nội"
-                label = line[0].upper()
-                opt_content = line[2:].strip()
-                options.append(
-                    {
-                        "content": opt_content,
-                        "label": label,
-                        "is_correct": False,  # sẽ set đúng sau
-                    }
-                )
-
-        # Set đáp án đúng
-        if correct_answer:
-            for opt in options:
-                if opt["label"] == correct_answer:
-                    opt["is_correct"] = True
-
-        questions.append(
-            {
-                "content": question_content,
-                "type": QuestionType.SINGLE_CHOICE.value,
-                "points": 1,
-                "options": [
-                    {"content": o["content"], "is_correct": o["is_correct"]}
-                    for o in options
-                ],
-            }
-        )
-
-    return questions
+        match = OPTION_RE.match(line)
+        if match:
+            options.append(
+                {
+                    "content": match.group(2).strip(),
+                    "label": match.group(1).upper(),
+                }
+            )
+
+    if content is not None:
+        yield _build_question(content, options, correct_answer)
+
+
+def iter_pdf_questions(file_path: str) -> Iterator[Dict]:
+    return iter_questions(iter_pdf_lines(file_path))
+
+
+def parse_pdf_to_questions(file_path: str) -> List[Dict]:
+    return list(iter_pdf_questions(file_path))
+
@@ -0,0 +1,143 @@
+import asyncio
+import multiprocessing
+import queue
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+from app.core.config import PDF_PARSE_TIMEOUT, PDF_PARSE_WORKERS
+
+_slots: asyncio.Semaphore | None = None
+_processes: set = set()
+_lock = threading.Lock()
+
+
+def _get_slots() -> asyncio.Semaphore:
+    """
+    Giới hạn số job PDF chạy cùng lúc (PDF_PARSE_WORKERS), tạo lần đầu
+    khi cần.
+    """
+    global _slots
+    with _lock:
+        if _slots is None:
+            _slots = asyncio.Semaphore(PDF_PARSE_WORKERS)
+        return _slots
+
+
+def _run(func: Callable, args: tuple, job_queue, stream: bool) -> None:
+    """
+    Chạy trong process con: đẩy kết quả `(True, value)` hoặc lỗi
+    `(False, exc)` của `func(*args)` vào `job_queue`. Với job stream,
+    `func` nhận thêm `job_queue` và kết quả được đẩy sau các phần tử của nó.
+    """
+    if stream:
+        args = args + (job_queue,)
+    try:
+        outcome = (True, func(*args))
+    except Exception as e:
+        outcome = (False, e)
+    try:
+        job_queue.put(outcome)
+    except Exception as e:
+        # Kết quả / lỗi không pickle được
+        job_queue.put((False, RuntimeError(str(e))))
+
+
+def shutdown_pdf_jobs() -> None:
+    """
+    Kill các process parse PDF còn chạy (khi tắt app).
+    """
+    with _lock:
+        processes = list(_processes)
+    for process in processes:
+        process.kill()
+
+
+@asynccontextmanager
+async def _job(func: Callable, args: tuple, stream: bool = False):
+    """
+    Chạy `_run(func, args, job_queue, stream)` trong một process riêng,
+    khi có slot trống. Yield `(process, job_queue)`.
+
+    Mỗi job có process riêng nên job quá hạn / bị huỷ chỉ kill process
+    của nó; các job khác chạy tiếp.
+    """
+    async with _get_slots():
+        loop = asyncio.get_running_loop()
+        job_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_run, args=(func, args, job_queue, stream), daemon=True
+        )
+        process.start()
+        with _lock:
+            _processes.add(process)
+        try:
+            yield process, job_queue
+        finally:
+            if process.is_alive():
+                process.kill()
+            await loop.run_in_executor(None, process.join)
+            with _lock:
+                _processes.discard(process)
+            process.close()
+            job_queue.close()
+
+
+async def _get(job_queue, process, deadline: float) -> Any:
+    """
+    Phần tử tiếp theo trong `job_queue`. Raise `asyncio.TimeoutError` khi
+    quá `deadline`, RuntimeError khi process chết mà không đẩy gì.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        # Kiểm tra trước khi get: process đã thoát thì dữ liệu của nó
+        # (nếu có) đã nằm sẵn trong queue
+        alive = process.is_alive()
+        try:
+            return await loop.run_in_executor(
+                None, job_queue.get, True, min(remaining, 1.0)
+            )
+        except queue.Empty:
+            if not alive:
+                raise RuntimeError(
+                    f"PDF worker exited with code {process.exitcode}")
+
+
+def _result(outcome: tuple) -> Any:
+    ok, value = outcome
+    if not ok:
+        raise value
+    return value
+
+
+async def run_pdf_job(func: Callable, *args: Any) -> Any:
+    """
+    Chạy `func(*args)` trong một process riêng mà không chặn event loop.
+
+    `func` phải là hàm cấp module (pickle được). Quá `PDF_PARSE_TIMEOUT`
+    giây thì process của job bị kill và raise `asyncio.TimeoutError`.
+    """
+    loop = asyncio.get_running_loop()
+    async with _job(func, args) as (process, job_queue):
+        deadline = loop.time() + PDF_PARSE_TIMEOUT
+        return _result(await _get(job_queue, process, deadline))
+
+
+async def iter_pdf_job(func: Callable, *args: Any) -> AsyncIterator[Any]:
+    """
+    Chạy `func(*args, queue)` trong một process riêng và yield từng phần
+    tử `func` đẩy vào queue cho đến khi gặp `None`.
+
+    Dùng chung `PDF_PARSE_TIMEOUT` cho cả job (quá hạn thì kill process
+    như `run_pdf_job`); lỗi của `func` được raise lại sau khi queue kết
+    thúc.
+    """
+    loop = asyncio.get_running_loop()
+    async with _job(func, args, stream=True) as (process, job_queue):
+        deadline = loop.time() + PDF_PARSE_TIMEOUT
+        while (item := await _get(job_queue, process, deadline)) is not None:
+            yield item
+        _result(await _get(job_queue, process, deadline))
@@ -0,0 +1,31 @@
+import os
+
+# app.core.config bắt buộc có DATABASE_URL khi import
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models.models  # noqa: F401 (đăng ký các bảng vào Base.metadata)
+from app.database.session import Base
+
+
+@pytest.fixture
+def db():
+    """
+    Session trên một database SQLite in-memory mới cho mỗi test.
+    """
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    session: Session = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
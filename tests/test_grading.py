@@ -0,0 +1,122 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.attempt import QuizAttemptAnswerCreate
+from app.services.grading import AnswerKey, compute_score, grade_answers
+
+QUIZ_ID = uuid4()
+ATTEMPT_ID = uuid4()
+
+
+@pytest.fixture
+def questions():
+    """
+    Hai câu hỏi, mỗi câu một đáp án đúng và một đáp án sai:
+    [(question_id, correct_option_id, wrong_option_id), ...]
+    """
+    return [(uuid4(), uuid4(), uuid4()) for _ in range(2)]
+
+
+@pytest.fixture
+def key(questions):
+    rows = []
+    for qid, correct, wrong in questions:
+        rows.append((True, qid, 2, correct, True))
+        rows.append((True, qid, 2, wrong, False))
+    return AnswerKey.from_rows(QUIZ_ID, rows)
+
+
+def answer(question_id, option_id=None) -> QuizAttemptAnswerCreate:
+    return QuizAttemptAnswerCreate(
+        question_id=question_id, option_id=option_id)
+
+
+def test_answer_key_from_rows(questions, key):
+    qid, correct, wrong = questions[0]
+
+    assert key.is_published
+    assert key.total_questions == 2
+    assert key.total_points == 4
+    assert key.questions[qid] == (
+        2, frozenset({correct, wrong}), frozenset({correct}))
+
+
+def test_answer_key_question_without_options():
+    qid = uuid4()
+    key = AnswerKey.from_rows(QUIZ_ID, [(False, qid, 1, None, None)])
+
+    assert not key.is_published
+    assert key.questions[qid] == (1, frozenset(), frozenset())
+
+
+def test_answer_key_quiz_without_questions():
+    key = AnswerKey.from_rows(QUIZ_ID, [(True, None, None, None, None)])
+
+    assert key.is_published
+    assert key.total_questions == 0
+
+
+def test_grade_correct_and_incorrect(questions, key):
+    (q1, correct1, _), (q2, _, wrong2) = questions
+
+    rows, correct_count = grade_answers(
+        key, ATTEMPT_ID, [answer(q1, correct1), answer(q2, wrong2)])
+
+    assert correct_count == 1
+    assert [
+        (r["question_id"], r["option_id"], r["is_correct"], r["score"])
+        for r in rows
+    ] == [(q1, correct1, True, 1), (q2, wrong2, False, 0)]
+    assert all(r["attempt_id"] == ATTEMPT_ID for r in rows)
+    assert len({r["id"] for r in rows}) == 2
+
+
+def test_grade_unanswered_option(questions, key):
+    qid = questions[0][0]
+
+    rows, correct_count = grade_answers(key, ATTEMPT_ID, [answer(qid)])
+
+    assert correct_count == 0
+    assert rows[0]["option_id"] is None
+    assert rows[0]["is_correct"] is False
+
+
+def test_grade_skips_unknown_question(questions, key):
+    qid, correct, _ = questions[0]
+
+    rows, correct_count = grade_answers(
+        key, ATTEMPT_ID, [answer(uuid4(), uuid4()), answer(qid, correct)])
+
+    assert correct_count == 1
+    assert [r["question_id"] for r in rows] == [qid]
+
+
+def test_grade_rejects_option_of_other_question(questions, key):
+    q1 = questions[0][0]
+    other_correct = questions[1][1]
+
+    with pytest.raises(HTTPException) as exc:
+        grade_answers(key, ATTEMPT_ID, [answer(q1, other_correct)])
+
+    assert exc.value.status_code == 400
+
+
+def test_grade_rejects_duplicate_question(questions, key):
+    qid, correct, wrong = questions[0]
+
+    with pytest.raises(HTTPException) as exc:
+        grade_answers(
+            key, ATTEMPT_ID, [answer(qid, correct), answer(qid, wrong)])
+
+    assert exc.value.status_code == 400
+    assert str(qid) in exc.value.detail
+
+
+@pytest.mark.parametrize(
+    "correct_count, total_questions, expected",
+    [(0, 0, 0), (0, 4, 0), (1, 3, 3.3), (2, 3, 6.7), (4, 4, 10)],
+)
+def test_compute_score(correct_count, total_questions, expected):
+    assert compute_score(correct_count, total_questions) == expected
@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.common.pagination import paginate
+from app.models.models import Course
+
+BASE_TIME = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def courses(db):
+    """
+    25 course, hai course liền nhau trùng created_at để thứ tự phải dựa
+    vào id. Trả về danh sách theo thứ tự (created_at, id) tăng dần.
+    """
+    rows = [
+        Course(
+            name=f"Course {i}",
+            code=f"C{i:02d}",
+            created_at=BASE_TIME + timedelta(minutes=i // 2),
+        )
+        for i in range(25)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return sorted(rows, key=lambda c: (c.created_at, c.id))
+
+
+def page_of(db, **kwargs) -> dict:
+    return paginate(
+        db.query(Course), [Course.created_at, Course.id], **kwargs
+    )
+
+
+def walk(db, page_size: int, descending: bool = False) -> list:
+    """Đọc hết bảng bằng next_cursor, bắt đầu từ trang 1."""
+    result = page_of(db, page_size=page_size, descending=descending)
+    items = list(result["data"])
+    while result["next_cursor"] is not None:
+        result = page_of(
+            db, page_size=page_size, cursor=result["next_cursor"],
+            descending=descending,
+        )
+        items.extend(result["data"])
+    return items
+
+
+def test_first_page(db, courses):
+    result = page_of(db, page=1, page_size=10)
+
+    assert result["data"] == courses[:10]
+    assert result["page"] == 1
+    assert result["page_size"] == 10
+    assert result["total_items"] == 25
+    assert result["total_page"] == 3
+    assert result["next"] == 2
+    assert result["next_cursor"] is not None
+
+
+def test_middle_page(db, courses):
+    result = page_of(db, page=2, page_size=10)
+
+    assert result["data"] == courses[10:20]
+    assert result["total_items"] == 25
+    assert result["next"] == 3
+
+
+def test_last_page_has_no_next(db, courses):
+    result = page_of(db, page=3, page_size=10)
+
+    assert result["data"] == courses[20:]
+    assert result["next"] is None
+    assert result["next_cursor"] is None
+
+
+def test_cursor_page(db, courses):
+    first = page_of(db, page_size=10)
+    result = page_of(db, page_size=10, cursor=first["next_cursor"])
+
+    assert result["data"] == courses[10:20]
+    # Chế độ keyset không tính tổng
+    assert result["page"] is None
+    assert result["total_items"] is None
+    assert result["total_page"] is None
+    assert result["next_cursor"] is not None
+
+
+def test_cursor_walk_matches_offset_order(db, courses):
+    # page_size lẻ để ranh giới trang rơi vào giữa các cặp trùng created_at
+    assert walk(db, page_size=3) == courses
+
+
+def test_cursor_last_page(db, courses):
+    cursor = page_of(db, page=2, page_size=10)["next_cursor"]
+    result = page_of(db, page_size=10, cursor=cursor)
+
+    assert result["data"] == courses[20:]
+    assert result["next_cursor"] is None
+
+
+def test_descending(db, courses):
+    result = page_of(db, page=1, page_size=10, descending=True)
+
+    assert result["data"] == courses[::-1][:10]
+    assert result["total_items"] == 25
+    assert walk(db, page_size=4, descending=True) == courses[::-1]
+
+
+def test_page_past_the_end(db, courses):
+    result = page_of(db, page=5, page_size=10)
+
+    assert result["data"] == []
+    # Không có dòng nào mang COUNT(*) OVER () → tổng đếm riêng
+    assert result["total_items"] == 25
+    assert result["total_page"] == 3
+    assert result["next"] is None
+    assert result["next_cursor"] is None
+
+
+def test_empty_table(db):
+    result = page_of(db, page=1, page_size=10)
+
+    assert result["data"] == []
+    assert result["total_items"] == 0
+    assert result["total_page"] == 0
+    assert result["next"] is None
+
+
+@pytest.mark.parametrize("total_mode", ["cached", "estimated"])
+def test_total_modes(db, courses, total_mode):
+    # "estimated" chỉ dùng planner của PostgreSQL, SQLite đếm chính xác
+    result = page_of(db, page=2, page_size=10, total_mode=total_mode)
+
+    assert result["data"] == courses[10:20]
+    assert result["total_items"] == 25
+    assert result["next"] == 3
+
+
+def test_tuple_rows(db, courses):
+    result = paginate(
+        db.query(Course, Course.code),
+        [Course.created_at, Course.id],
+        page_size=10,
+        row_entity=lambda row: row[0],
+    )
+
+    assert [row.code for row in result["data"]] == [
+        c.code for c in courses[:10]]
+    assert [course for course, _ in result["data"]] == courses[:10]
+    assert result["total_items"] == 25
+
+
+def test_invalid_cursor(db, courses):
+    with pytest.raises(HTTPException) as exc:
+        page_of(db, page_size=10, cursor="not-a-cursor")
+
+    assert exc.value.status_code == 400